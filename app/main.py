@@ -6,17 +6,19 @@ import plotly.graph_objects as go
 import sqlalchemy as sa
 from datetime import datetime, timedelta
 import io
+import ast
 import base64
 import zipfile
 import json
 import os
 from utils.data_processing import (
     load_roster_data, load_equipment_data, load_events_data, load_event_equip_data,
+    load_event_equip_by_name, create_default_roster, create_default_event_equipment,
     time_str_to_minutes, minutes_to_time_str, military_time_to_minutes, 
     calculate_duration_minutes, minutes_to_mmss
 )
 from utils.calculations import (
-    calculate_initial_difficulty, calculate_actual_difficulty,
+    calculate_initial_difficulty, calculate_actual_difficulty, calculate_difficulties,
     calculate_target_difficulty, adjust_equipment_weight, adjust_distance,
     predict_team_success
 )
@@ -52,10 +54,6 @@ print(f"Save directory: {save_dir}")
 # Create sample data files if they don't exist
 def ensure_sample_data_exists():
     """Create sample data files if they don't exist"""
-    from utils.data_processing import (
-        create_default_roster, create_default_event_equipment
-    )
-    
     # Check and create roster data
     roster_path = os.path.join(data_dir, 'sample_roster.csv')
     if not os.path.exists(roster_path):
@@ -78,6 +76,18 @@ st.set_page_config(
     layout="wide"
 )
 
+# Numeric column types for event records, so recorded rows don't fall back to object columns
+EVENT_RECORDS_DTYPES = {
+    'Day': 'int64', 'Event_Number': 'int64', 'Heat_Category': 'int64',
+    'Initial_Participants': 'int64', 'Drops': 'int64',
+    'Equipment_Weight': 'float64', 'Distance_km': 'float64', 'Time_Actual_Minutes': 'float64',
+    'Initial_Difficulty': 'float64', 'Actual_Difficulty': 'float64', 'Temperature_Multiplier': 'float64'
+}
+# Label columns kept as categoricals so the team/event filters compare small integer codes
+EVENT_RECORDS_CATEGORIES = {'Team': 'category', 'Event_Name': 'category'}
+# Text columns typed up front so appended rows keep Arrow-backed strings instead of object
+EVENT_RECORDS_STRINGS = {'Equipment_Name': 'str', 'Start_Time': 'str', 'End_Time': 'str', 'Time_Actual': 'str'}
+
 # Initialize session state variables
 if 'roster_data' not in st.session_state:
     st.session_state.roster_data = None
@@ -92,14 +102,20 @@ if 'event_records' not in st.session_state:
         'Start_Time', 'End_Time', 'Time_Actual', 'Time_Actual_Minutes',
         'Initial_Participants', 'Drops', 'Initial_Difficulty', 'Actual_Difficulty',
         'Temperature_Multiplier'
-    ])
+    ]).astype({**EVENT_RECORDS_DTYPES, **EVENT_RECORDS_CATEGORIES, **EVENT_RECORDS_STRINGS})
 if 'drop_data' not in st.session_state:
     st.session_state.drop_data = pd.DataFrame(columns=[
         'Team', 'Participant_Name', 'Roster_Number', 'Event_Name', 'Drop_Time', 
         'Day', 'Event_Number'
     ])
+if 'drop_data_version' not in st.session_state:
+    st.session_state.drop_data_version = 0
+if 'event_records_version' not in st.session_state:
+    st.session_state.event_records_version = 0
 if 'reshuffled_teams' not in st.session_state:
     st.session_state.reshuffled_teams = None
+if 'reshuffled_teams_csv' not in st.session_state:
+    st.session_state.reshuffled_teams_csv = None
 if 'session_name' not in st.session_state:
     st.session_state.session_name = "default_session"
 if 'four_day_plan' not in st.session_state:
@@ -107,7 +123,63 @@ if 'four_day_plan' not in st.session_state:
 if 'structured_four_day_plan' not in st.session_state:
     st.session_state.structured_four_day_plan = None
 
+# Column layout for the single-row fallback equipment list
+BASIC_EQUIPMENT_TEMPLATE = pd.DataFrame(
+    columns=['EquipmentName', 'EquipWt', 'EquipNum', 'AppRatio', 'AppRatioWT']
+).astype({'EquipWt': 'float64', 'EquipNum': 'int64', 'AppRatio': 'int64', 'AppRatioWT': 'float64'})
+
+# Shared empty placeholder for records or drops that are missing; never modified
+EMPTY_FRAME = pd.DataFrame()
+
+# Temperature multiplier for each heat category (index = category, categories 1-3 are neutral)
+HEAT_MULTIPLIER = np.array([1.0, 1.0, 1.0, 1.0, 1.15, 1.3])
+
+# Heat category options shown in the event forms
+HEAT_CATEGORIES = {
+    1: "Heat Category 1 (no multiplier)",
+    2: "Heat Category 2 (no multiplier)",
+    3: "Heat Category 3 (no multiplier)",
+    4: "Heat Category 4 (1.15x multiplier)",
+    5: "Heat Category 5 (1.3x multiplier)"
+}
+
+# Upper bound on events per day, used to pack (Day, Event_Number) into a single rank
+EVENT_RANK_STRIDE = 1000
+
+# Rows sent to the browser per page for the large record tables
+TABLE_PAGE_SIZE = 200
+
+# The event summary keeps Difficulty numeric and lets the table format it client-side
+EVENT_SUMMARY_COLUMN_CONFIG = {'Difficulty': st.column_config.NumberColumn(format="%.2f")}
+
+# Columns of the per-team difficulty adjustment store
+TEAM_ADJUSTMENT_COLUMNS = ['event_key', 'team', 'adjusted_weight', 'adjusted_distance']
+
+# Session caches of derived views
+def get_versioned_cache(key, version):
+    """Return the session cache dict stored under key, emptied whenever its version changes"""
+    cached = st.session_state.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, {})
+        st.session_state[key] = cached
+    return cached[1]
+
+def get_record_views_version():
+    """Return the version of views derived from the event records"""
+    # Drop changes rewrite participants and difficulty in the records, so both versions count
+    return (st.session_state.event_records_version, st.session_state.drop_data_version)
+
 # Functions for session state persistence
+def write_session_csv(session_dir, file_name, df, version=None):
+    """Write a session table to CSV unless it was already saved there at the same version"""
+    path = os.path.join(session_dir, file_name)
+    # Only tables with a version counter can be known unchanged, so tables without one are always written
+    saved_versions = get_versioned_cache('saved_tables_cache', session_dir)
+    if version is not None and saved_versions.get(file_name) == version and os.path.exists(path):
+        return
+    df.to_csv(path, index=False)
+    saved_versions[file_name] = version
+
 def save_session_state(session_name=None):
     """Save session state to disk with an optional session name"""
     if session_name:
@@ -117,28 +189,30 @@ def save_session_state(session_name=None):
     session_dir = os.path.join(save_dir, st.session_state.session_name)
     os.makedirs(session_dir, exist_ok=True)
     
-    # Save DataFrames to CSV files
+    # Save DataFrames to CSV files, skipping versioned tables unchanged since the last save
     if st.session_state.roster_data is not None:
-        st.session_state.roster_data.to_csv(os.path.join(session_dir, 'roster_data.csv'), index=False)
+        write_session_csv(session_dir, 'roster_data.csv', st.session_state.roster_data)
     
     if st.session_state.equipment_data is not None:
-        st.session_state.equipment_data.to_csv(os.path.join(session_dir, 'equipment_data.csv'), index=False)
+        write_session_csv(session_dir, 'equipment_data.csv', st.session_state.equipment_data)
     
     if st.session_state.events_data is not None:
-        st.session_state.events_data.to_csv(os.path.join(session_dir, 'events_data.csv'), index=False)
+        write_session_csv(session_dir, 'events_data.csv', st.session_state.events_data)
     
     if not st.session_state.event_records.empty:
-        st.session_state.event_records.to_csv(os.path.join(session_dir, 'event_records.csv'), index=False)
+        write_session_csv(session_dir, 'event_records.csv', st.session_state.event_records,
+                          get_record_views_version())
     
     if not st.session_state.drop_data.empty:
-        st.session_state.drop_data.to_csv(os.path.join(session_dir, 'drop_data.csv'), index=False)
+        write_session_csv(session_dir, 'drop_data.csv', st.session_state.drop_data,
+                          st.session_state.drop_data_version)
     
     if st.session_state.reshuffled_teams is not None:
-        st.session_state.reshuffled_teams.to_csv(os.path.join(session_dir, 'reshuffled_teams.csv'), index=False)
+        write_session_csv(session_dir, 'reshuffled_teams.csv', st.session_state.reshuffled_teams)
     
     # Save the 4-day plan
     if st.session_state.structured_four_day_plan is not None:
-        st.session_state.structured_four_day_plan.to_csv(os.path.join(session_dir, 'four_day_plan.csv'), index=False)
+        write_session_csv(session_dir, 'four_day_plan.csv', st.session_state.structured_four_day_plan)
     
     # Save a JSON file with the four_day_plan dictionary
     with open(os.path.join(session_dir, 'four_day_plan_dict.json'), 'w') as f:
@@ -188,15 +262,17 @@ def load_session_state(session_name):
         # Load event records if they exist
         event_records_path = os.path.join(session_dir, 'event_records.csv')
         if os.path.exists(event_records_path):
-            st.session_state.event_records = pd.read_csv(event_records_path)
+            st.session_state.event_records = categorize_event_records(pd.read_csv(event_records_path))
+            mark_event_records_changed()
         # Load drop data if it exists
         drop_data_path = os.path.join(session_dir, 'drop_data.csv')
         if os.path.exists(drop_data_path):
             st.session_state.drop_data = pd.read_csv(drop_data_path)
+            mark_drop_data_changed()
         # Load reshuffled teams if they exist
         reshuffled_teams_path = os.path.join(session_dir, 'reshuffled_teams.csv')
         if os.path.exists(reshuffled_teams_path):
-            st.session_state.reshuffled_teams = pd.read_csv(reshuffled_teams_path)
+            set_reshuffled_teams(pd.read_csv(reshuffled_teams_path))
         # Load the 4-day plan if it exists
         four_day_plan_path = os.path.join(session_dir, 'four_day_plan.csv')
         if os.path.exists(four_day_plan_path):
@@ -233,6 +309,1088 @@ def get_available_sessions():
                 sessions.append(item)
     return sessions
 
+def mark_drop_data_changed():
+    """Bump the drop data version so views derived from it are rebuilt"""
+    st.session_state.drop_data_version += 1
+
+def get_drop_index():
+    """Return drop data indexed and sorted by team, day and event number"""
+    cache = get_versioned_cache('drop_index_cache', st.session_state.drop_data_version)
+    if 'drop_index' not in cache:
+        cache['drop_index'] = st.session_state.drop_data.set_index(['Team', 'Day', 'Event_Number']).sort_index()
+    return cache['drop_index']
+
+def get_drop_positions_index():
+    """Return drop row positions indexed and sorted by team, day, event number, event name and roster number"""
+    cache = get_versioned_cache('drop_positions_index_cache', st.session_state.drop_data_version)
+    if 'drop_positions' not in cache:
+        drop_data = st.session_state.drop_data
+        key_cols = ['Team', 'Day', 'Event_Number', 'Event_Name', 'Roster_Number']
+        cache['drop_positions'] = pd.Series(
+            np.arange(len(drop_data)),
+            index=pd.MultiIndex.from_arrays([drop_data[col].to_numpy() for col in key_cols], names=key_cols)
+        ).sort_index()
+    return cache['drop_positions']
+
+def find_drop_positions(team_name, day, event_number, event_name, roster_number):
+    """Return the row positions in drop_data of a participant's drops during one event, in row order"""
+    key = (team_name, day, event_number, event_name, roster_number)
+    return np.sort(get_drop_positions_index().loc[key:key].to_numpy())
+
+def get_team_drops(team_name, before_day=None, before_event=None):
+    """Return a team's drops, optionally only those from events before the given one"""
+    drop_index = get_drop_index()
+    if before_day is None:
+        team_drops = drop_index.loc[(team_name,):(team_name,)]
+    else:
+        # Earlier days, or earlier events on the same day
+        team_drops = drop_index.loc[(team_name,):(team_name, before_day, before_event - 1)]
+    return team_drops.reset_index()
+
+def get_event_drops(team_name, day, event_number, event_name):
+    """Return the drops recorded during a specific event"""
+    event_drops = get_drop_index().loc[(team_name, day, event_number):(team_name, day, event_number)]
+    # Between-event drops share the event number, so match on the name as well
+    return event_drops[event_drops['Event_Name'].to_numpy() == event_name].reset_index()
+
+def get_team_first_drops(team_name):
+    """Return a team's dropped roster numbers and the rank of each one's first drop, ordered by that rank"""
+    # Results are reused until the drop data changes
+    cache = get_versioned_cache('team_first_drops_cache', st.session_state.drop_data_version)
+    if team_name not in cache:
+        team_drops = get_team_drops(team_name)
+        drop_ranks = event_rank(team_drops['Day'].to_numpy(), team_drops['Event_Number'].to_numpy())
+        first_drops = pd.Series(drop_ranks).groupby(team_drops['Roster_Number'].to_numpy()).min().sort_values(kind='stable')
+        cache[team_name] = (first_drops.to_numpy(), first_drops.index.tolist())
+    return cache[team_name]
+
+def get_previous_drop_rosters(team_name, day, event_number):
+    """Return the distinct roster numbers a team lost in events before the given one"""
+    # Results are reused until the drop data changes
+    cache = get_versioned_cache('previous_drop_rosters_cache', st.session_state.drop_data_version)
+    key = (team_name, day, event_number)
+    if key not in cache:
+        # Rosters are ordered by first drop, so the earlier ones are a prefix found by binary search
+        first_drop_ranks, rosters = get_team_first_drops(team_name)
+        cutoff = np.searchsorted(first_drop_ranks, event_rank(day, event_number), side='left')
+        # A frozenset gives O(1) membership and is safe to share between callers
+        cache[key] = frozenset(rosters[:cutoff])
+    return cache[key]
+
+def categorize_event_records(records):
+    """Cast the event records label columns to categoricals"""
+    return records.astype({col: dtype for col, dtype in EVENT_RECORDS_CATEGORIES.items() if col in records.columns})
+
+def mark_event_records_changed():
+    """Bump the event records version so views derived from them are rebuilt"""
+    st.session_state.event_records_version += 1
+
+def get_event_records_index():
+    """Return event record row positions indexed and sorted by team, day, event number and event name"""
+    cache = get_versioned_cache('event_records_index_cache', st.session_state.event_records_version)
+    if 'records_index' not in cache:
+        records = st.session_state.event_records
+        cache['records_index'] = pd.Series(
+            np.arange(len(records)),
+            # Plain value levels, so lookups for events not recorded yet just come back empty
+            index=pd.MultiIndex.from_arrays(
+                [records[col].to_numpy() for col in ['Team', 'Day', 'Event_Number', 'Event_Name']],
+                names=['Team', 'Day', 'Event_Number', 'Event_Name']
+            )
+        ).sort_index()
+    return cache['records_index']
+
+def get_team_event_records(team_name, day=None, event_number=None, event_name=None):
+    """Return a team's event records, optionally narrowed to a day, an event number and an event name"""
+    records = st.session_state.event_records
+    if records.empty:
+        return records
+    key = (team_name,)
+    for part in (day, event_number, event_name):
+        if part is None:
+            break
+        key += (part,)
+    positions = get_event_records_index().loc[key:key].to_numpy()
+    # Keep the original row order and labels so callers can write back with .loc
+    return records.iloc[np.sort(positions)]
+
+def get_team_records_by_event(team_name):
+    """Map each (day, event number, event name) a team has recorded to its event record rows"""
+    team_records = get_team_event_records(team_name)
+    positions_by_event = {}
+    for pos, key in enumerate(zip(team_records['Day'].tolist(), team_records['Event_Number'].tolist(),
+                                  team_records['Event_Name'].tolist())):
+        positions_by_event.setdefault(key, []).append(pos)
+    return {key: team_records.iloc[positions] for key, positions in positions_by_event.items()}
+
+def get_last_event_numbers(team_name):
+    """Return the highest recorded event number on each day for a team"""
+    # Rebuilt only when the event records change
+    cache = get_versioned_cache('last_event_numbers_cache', st.session_state.event_records_version)
+    if team_name not in cache:
+        team_records = get_team_event_records(team_name)
+        cache[team_name] = {
+            int(day): int(event_number)
+            for day, event_number in team_records.groupby('Day')['Event_Number'].max().items()
+        }
+    return cache[team_name]
+
+def get_phase_cache():
+    """Return the per-phase cache, cleared whenever the event records or drops change"""
+    return get_versioned_cache('phase_cache', get_record_views_version())
+
+def get_phase_records(days):
+    """Return the event records for a phase of the course, such as Days 1-2"""
+    phase_cache = get_phase_cache()
+    key = ('records', days)
+    if key not in phase_cache:
+        records = st.session_state.event_records
+        phase_cache[key] = records[records['Day'].isin(days)]
+    return phase_cache[key]
+
+def get_phase_stats(days):
+    """Return the difficulty and drop summary statistics for a phase of the course"""
+    phase_cache = get_phase_cache()
+    key = ('stats', days)
+    if key not in phase_cache:
+        phase_records = get_phase_records(days)
+        difficulty = phase_records['Actual_Difficulty']
+        phase_cache[key] = {
+            'Average Difficulty': difficulty.mean(),
+            'Max Difficulty': difficulty.max(),
+            'Min Difficulty': difficulty.min(),
+            'Total Events': len(phase_records),
+            'Total Drops': phase_records['Drops'].sum()
+        }
+    return phase_cache[key]
+
+def event_rank(day, event_number):
+    """Pack a day and event number into one value that orders events chronologically"""
+    return day * EVENT_RANK_STRIDE + event_number
+
+def to_json_value(value):
+    """Convert numpy scalars to plain Python values for JSON serialization"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def serialize_equipment_details(equipment_details):
+    """Serialize an event's equipment details for storage in the event records"""
+    return json.dumps(equipment_details, default=to_json_value)
+
+def parse_equipment_details(equip_details):
+    """Parse stored equipment details, accepting JSON or the older Python repr format"""
+    try:
+        return json.loads(equip_details)
+    except ValueError:
+        return ast.literal_eval(equip_details)
+
+@st.cache_data(ttl=600)
+def parse_equipment_quantities(equip_details):
+    """Map each equipment name in stored equipment details to its first recorded quantity"""
+    quantities = {}
+    for item in parse_equipment_details(equip_details):
+        quantities.setdefault(item['Name'], int(item['Quantity']))
+    return quantities
+
+def to_csv_b64(df):
+    """Encode a DataFrame as base64 CSV for a download link, writing the CSV straight to bytes"""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+def get_team_records_csv_b64(team_name, team_records):
+    """Return a team's event records as base64-encoded CSV, reused until the records or drops change"""
+    cache = get_versioned_cache('team_records_csv_cache', get_record_views_version())
+    if team_name not in cache:
+        cache[team_name] = to_csv_b64(team_records)
+    return cache[team_name]
+
+def get_cached_figure(name, build_figure):
+    """Return a visualization figure, rebuilt only when the records or drops change"""
+    cache = get_versioned_cache('figure_cache', get_record_views_version())
+    if name not in cache:
+        cache[name] = build_figure()
+    return cache[name]
+
+def build_difficulty_heatmap():
+    """Build the annotated heat map of average difficulty by team and day"""
+    # Calculate average difficulty by team and day
+    # The pivot below orders rows and columns itself, so the groupby can skip sorting
+    heatmap_data = st.session_state.event_records.groupby(['Team', 'Day'], observed=True, sort=False)['Actual_Difficulty'].mean().reset_index()
+    # Pivot the data for the heat map
+    heatmap_pivot = heatmap_data.pivot(index='Team', columns='Day', values='Actual_Difficulty')
+    # Create heat map
+    fig = px.imshow(
+        heatmap_pivot,
+        labels=dict(x="Day", y="Team", color="Difficulty"),
+        x=heatmap_pivot.columns,
+        y=heatmap_pivot.index,
+        color_continuous_scale='Viridis',
+        title='Difficulty Heat Map by Team and Day'
+    )
+    # Add text annotations with values
+    for i in range(len(heatmap_pivot.index)):
+        for j in range(len(heatmap_pivot.columns)):
+            value = heatmap_pivot.iloc[i, j]
+            if not pd.isna(value):  # Only add annotation if value is not NaN
+                fig.add_annotation(
+                    x=heatmap_pivot.columns[j],
+                    y=heatmap_pivot.index[i],
+                    text=f"{value:.2f}",
+                    showarrow=False,
+                    font=dict(color="white" if value > 3 else "black")
+                )
+    return fig
+
+def build_difficulty_scatter(x_col, x_label, title):
+    """Build a scatter of difficulty against an event measure with an OLS trendline"""
+    return px.scatter(
+        st.session_state.event_records,
+        x=x_col,
+        y='Actual_Difficulty',
+        color='Day',
+        hover_data=['Event_Name', 'Team'],
+        title=title,
+        labels={
+            x_col: x_label,
+            'Actual_Difficulty': 'Actual Difficulty',
+            'Day': 'Day'
+        },
+        trendline="ols"  # Add regression line
+    )
+
+def filter_records(teams, days, events, phase_days=None, drop_days=()):
+    """Filter event records and drops by team, day and event and count the drops per event"""
+    # Results live in the phase cache, so reruns reuse them until the records or drops change
+    phase_cache = get_phase_cache()
+    key = ('filtered', phase_days, teams, days, events, drop_days)
+    if key in phase_cache:
+        return phase_cache[key]
+    records = st.session_state.event_records if phase_days is None else get_phase_records(phase_days)
+    drop_data = st.session_state.drop_data
+    # AND the masks together so each frame is indexed only once
+    records_mask = records['Team'].isin(teams).to_numpy()
+    drops_mask = drop_data['Team'].isin(teams).to_numpy()
+    if drop_days:
+        drops_mask = drops_mask & drop_data['Day'].isin(drop_days).to_numpy()
+    if days:
+        records_mask = records_mask & records['Day'].isin(days).to_numpy()
+        drops_mask = drops_mask & drop_data['Day'].isin(days).to_numpy()
+    if events:
+        records_mask = records_mask & records['Event_Name'].isin(events).to_numpy()
+        drops_mask = drops_mask & drop_data['Event_Name'].isin(events).to_numpy()
+    filtered_records = records[records_mask]
+    filtered_drops = drop_data[drops_mask]
+    # Group by team, day, event and sort the small summary once afterwards
+    drop_summary = filtered_drops.groupby(
+        ['Team', 'Day', 'Event_Number', 'Event_Name'], observed=True, sort=False
+    ).size().reset_index(name='Drop_Count')
+    drop_summary = drop_summary.sort_values(['Team', 'Day', 'Event_Number', 'Event_Name'])
+    phase_cache[key] = (filtered_records, filtered_drops, drop_summary)
+    return phase_cache[key]
+
+def get_filtered_csv_bytes(table, teams, days, events, phase_days=None, drop_days=()):
+    """Return the filtered 'records' or 'drops' table as CSV bytes, kept in the phase cache next to the filter result"""
+    phase_cache = get_phase_cache()
+    key = ('csv', table, phase_days, teams, days, events, drop_days)
+    if key not in phase_cache:
+        filtered_records, filtered_drops, _ = filter_records(teams, days, events, phase_days, drop_days)
+        phase_cache[key] = to_csv_bytes(filtered_records if table == 'records' else filtered_drops)
+    return phase_cache[key]
+
+def get_table_page(df, key):
+    """Return the page of a large table to display, adding a page selector when it spans several pages"""
+    if len(df) <= TABLE_PAGE_SIZE:
+        return df
+    page_count = -(-len(df) // TABLE_PAGE_SIZE)
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, key=key)
+    start = (page - 1) * TABLE_PAGE_SIZE
+    return df.iloc[start:start + TABLE_PAGE_SIZE]
+
+def to_csv_bytes(df):
+    """Serialize a DataFrame to CSV bytes for st.download_button"""
+    return df.to_csv(index=False).encode()
+
+def set_reshuffled_teams(reshuffled_teams):
+    """Store new Days 3-4 team assignments along with their download CSV"""
+    st.session_state.reshuffled_teams = reshuffled_teams
+    st.session_state.reshuffled_teams_csv = to_csv_bytes(reshuffled_teams)
+
+@st.cache_data(ttl=600)
+def get_plan_events_by_day(plan):
+    """Map each plan day to its event names in event order and a mapping of event names to their plan row dicts"""
+    plan_events = {}
+    # Sort once and split by day in a single pass instead of filtering the plan per day tab
+    for day, day_plan in plan.sort_values('Event_Number', kind='stable').groupby('Day'):
+        # Plain dicts per plan row instead of boxing each row into a Series
+        event_details_by_name = {event['Event_Name']: event for event in day_plan.to_dict('records')}
+        plan_events[int(day)] = (day_plan['Event_Name'].tolist(), event_details_by_name)
+    return plan_events
+
+def get_adjustment_index(team_adjustments):
+    """Map (event_key, team) to the adjusted weight and distance from a DataFrame or list of adjustment records"""
+    adjustments = pd.DataFrame(team_adjustments if team_adjustments is not None else [], columns=TEAM_ADJUSTMENT_COLUMNS)
+    if adjustments.empty:
+        return {}
+    # Keep the first adjustment recorded for each event and team
+    adjustments = adjustments.drop_duplicates(['event_key', 'team']).set_index(['event_key', 'team'])
+    return adjustments[['adjusted_weight', 'adjusted_distance']].to_dict('index')
+
+def build_event_summary(team_records):
+    """Build the display table summarizing a team's recorded events"""
+    initial_participants = team_records['Initial_Participants']
+    return pd.DataFrame({
+        'Day': team_records['Day'],
+        'Event': 'Event ' + team_records['Event_Number'].astype(str) + ': ' + team_records['Event_Name'].astype(str),
+        'Duration': team_records['Time_Actual'],
+        'Distance': team_records['Distance_km'].astype(str) + ' km',
+        'Heat': team_records['Heat_Category'],
+        'Participants': (initial_participants - team_records['Drops']).astype(str) + ' / ' + initial_participants.astype(str),
+        'Drops': team_records['Drops'],
+        'Difficulty': team_records['Actual_Difficulty']
+    }).reset_index(drop=True)
+
+def build_basic_equipment(event_details):
+    """Build a single-row equipment list from the event details in the 4-day plan"""
+    equip_wt = event_details.get('Equipment_Weight', 0)
+    equip_num = event_details.get('Number_of_Equipment', 1)
+    basic_equipment = BASIC_EQUIPMENT_TEMPLATE.copy()
+    basic_equipment.loc[0] = [
+        event_details.get('Equipment_Name', 'Generic Equipment'),
+        equip_wt, equip_num, 1, equip_wt * equip_num
+    ]
+    return basic_equipment
+
+def recompute_subsequent_events(team_name, team_size, from_day, from_event):
+    """Update participants and difficulty scores for a team's events after the given event"""
+    if st.session_state.event_records.empty:
+        return
+    # Get all events for this team that occur after the given event
+    team_events = get_team_event_records(team_name)
+    team_ranks = event_rank(team_events['Day'].to_numpy(), team_events['Event_Number'].to_numpy())
+    subsequent_events = team_events[team_ranks > event_rank(from_day, from_event)]
+    # A participant counts as dropped before an event once their earliest drop ranks below it
+    first_drop_ranks, _ = get_team_first_drops(team_name)
+    # Updated initial participants for every subsequent event in one vectorized pass
+    subsequent_ranks = event_rank(subsequent_events['Day'].to_numpy(), subsequent_events['Event_Number'].to_numpy())
+    updated_participants = team_size - np.searchsorted(first_drop_ranks, subsequent_ranks, side='left')
+    st.session_state.event_records.loc[subsequent_events.index, 'Initial_Participants'] = updated_participants
+    # Drop counts per event for this team, looked up by (day, event number, event name)
+    team_drops = get_team_drops(team_name)
+    drop_counts = team_drops.groupby(['Day', 'Event_Number', 'Event_Name'], sort=False).size().to_dict() if not team_drops.empty else {}
+    event_keys = list(zip(subsequent_events['Day'].tolist(), subsequent_events['Event_Number'].tolist(), subsequent_events['Event_Name'].tolist()))
+    drops_counts = np.array([drop_counts.get(key, 0) for key in event_keys], dtype=int)
+    # Recalculate both difficulty scores for every subsequent event in one vectorized pass
+    temp_multipliers = subsequent_events['Temperature_Multiplier'].to_numpy(dtype=float)
+    total_weights = subsequent_events['Equipment_Weight'].to_numpy(dtype=float) * subsequent_events['Number_of_Equipment'].to_numpy(dtype=float)
+    distances = subsequent_events['Distance_km'].to_numpy(dtype=float)
+    event_names = subsequent_events['Event_Name'].to_numpy()
+    time_limits = [time_str_to_minutes(t) for t in subsequent_events['Time_Limit']]
+    actual_minutes = subsequent_events['Time_Actual_Minutes'].to_numpy(dtype=float)
+    initial_difficulties = calculate_difficulties(temp_multipliers, total_weights, updated_participants, distances, time_limits, event_names)
+    actual_difficulties = calculate_difficulties(temp_multipliers, total_weights, updated_participants, distances, actual_minutes, event_names)
+    # Events with drops weight the participants by drop time, so they still go through the scalar path
+    for i in np.flatnonzero(drops_counts):
+        event_day, event_num, event_name = event_keys[i]
+        actual_difficulties[i] = calculate_actual_difficulty(
+            temp_multipliers[i],
+            total_weights[i],
+            updated_participants[i],
+            distances[i],
+            actual_minutes[i],
+            drops_counts[i],
+            get_event_drops(team_name, event_day, event_num, event_name),
+            event_day,
+            event_num,
+            event_name,
+            "00:00"  # Start time is always 0 in the new format
+        )
+    # Update difficulty scores
+    st.session_state.event_records.loc[subsequent_events.index, 'Initial_Difficulty'] = initial_difficulties
+    st.session_state.event_records.loc[subsequent_events.index, 'Actual_Difficulty'] = actual_difficulties
+
+def refresh_event_drops(team_name, day, event_number, event_name):
+    """Update the drop count and actual difficulty of a recorded event after its drops change"""
+    event_record = get_team_event_records(team_name, day, event_number, event_name)
+    if event_record.empty:
+        return
+    # Get the current drops for this event
+    event_drops = get_event_drops(team_name, day, event_number, event_name)
+    drops_count = len(event_drops)
+    # Update the drops count in the event record
+    st.session_state.event_records.loc[event_record.index[0], 'Drops'] = drops_count
+    # Recalculate the actual difficulty with the new drops count
+    record = next(event_record.itertuples(index=False))
+    temp_multiplier = record.Temperature_Multiplier
+    total_weight = record.Equipment_Weight * record.Number_of_Equipment
+    initial_participants = record.Initial_Participants
+    distance_km = record.Distance_km
+    time_actual_min = record.Time_Actual_Minutes
+    # Recalculate actual difficulty
+    actual_difficulty = calculate_actual_difficulty(
+        temp_multiplier, total_weight, initial_participants,
+        distance_km, time_actual_min, drops_count,
+        event_drops, day, event_number, event_name,
+        "00:00"  # Start time is always 0 in the new format
+    )
+    # Update the actual difficulty
+    st.session_state.event_records.loc[event_record.index[0], 'Actual_Difficulty'] = actual_difficulty
+
+def handle_add_drop(team_name, team_size, day, event_number, event_name,
+                    drop_participant, drop_roster_number, drop_time):
+    """Record a participant dropping during an event and refresh the affected event records"""
+    try:
+        # Add to drop data
+        new_drop = {
+            'Team': team_name,
+            'Participant_Name': drop_participant,
+            'Roster_Number': drop_roster_number,
+            'Event_Name': event_name,
+            'Drop_Time': drop_time,
+            'Day': day,
+            'Event_Number': event_number,
+            'Is_Between_Events': False
+        }
+        # Create the drop_data DataFrame if it doesn't exist or is empty
+        if 'drop_data' not in st.session_state or st.session_state.drop_data.empty:
+            st.session_state.drop_data = pd.DataFrame([new_drop])
+        else:
+            # Check if this drop already exists through the cached drop index
+            existing_positions = find_drop_positions(team_name, day, event_number, event_name, drop_roster_number)
+            if len(existing_positions) == 0:
+                # Add the new drop
+                st.session_state.drop_data = pd.concat([
+                    st.session_state.drop_data,
+                    pd.DataFrame([new_drop])
+                ], ignore_index=True)
+            else:
+                # Update the existing drop
+                drop_data = st.session_state.drop_data
+                drop_data.iat[existing_positions[0], drop_data.columns.get_loc('Drop_Time')] = drop_time
+        # Invalidate views derived from the drop data
+        mark_drop_data_changed()
+        # Update the corresponding event record if it exists
+        refresh_event_drops(team_name, day, event_number, event_name)
+        # Update ALL subsequent event records for this team to reflect the drop
+        recompute_subsequent_events(team_name, team_size, day, event_number)
+        st.success(f"{drop_participant} marked as dropped at {drop_time}")
+        # Save session
+        save_session_state()
+        # Need to rerun to refresh the UI
+        st.rerun()
+    except Exception as e:
+        st.error(f"Error recording drop: {str(e)}")
+
+def handle_remove_drop(team_name, team_size, day, event_number, event_name,
+                       participant_to_remove, remove_roster_number):
+    """Remove a recorded drop from an event and refresh the affected event records"""
+    try:
+        # Remove this drop from the drop_data, locating its rows through the cached drop index
+        drop_data = st.session_state.drop_data
+        remove_positions = find_drop_positions(team_name, day, event_number, event_name, remove_roster_number)
+        st.session_state.drop_data = drop_data.drop(drop_data.index[remove_positions])
+        # Invalidate views derived from the drop data
+        mark_drop_data_changed()
+        # Update the corresponding event record if it exists
+        refresh_event_drops(team_name, day, event_number, event_name)
+        # Update ALL subsequent event records for this team to reflect the removed drop
+        recompute_subsequent_events(team_name, team_size, day, event_number)
+        st.success(f"Removed drop for {participant_to_remove}")
+        # Save session and refresh
+        save_session_state()
+        st.rerun()
+    except Exception as e:
+        st.error(f"Error removing drop: {str(e)}")
+
+def handle_between_event_drop(team_name, team_size, day, event_number, event_name,
+                              participant, roster_number):
+    """Record a participant dropping between events and refresh the affected event records"""
+    try:
+        # Create a new drop record
+        new_drop = {
+            'Team': team_name,
+            'Participant_Name': participant,
+            'Roster_Number': roster_number,
+            'Event_Name': f"Between Events ({event_name})",
+            'Drop_Time': "Between Events",
+            'Day': day,
+            'Event_Number': event_number,
+            'Is_Between_Events': True  # Add a flag to identify between-event drops
+        }
+        # Add to drop data
+        if 'drop_data' not in st.session_state or st.session_state.drop_data.empty:
+            st.session_state.drop_data = pd.DataFrame([new_drop])
+        else:
+            # Check if this drop already exists among the team's drops for the day
+            day_drops = get_drop_index().loc[(team_name, day):(team_name, day)]
+            existing_drop = day_drops[
+                (day_drops['Roster_Number'].to_numpy() == roster_number) &
+                (day_drops['Is_Between_Events'].to_numpy() == True)
+            ]
+            if existing_drop.empty:
+                # Add the new drop
+                st.session_state.drop_data = pd.concat([
+                    st.session_state.drop_data,
+                    pd.DataFrame([new_drop])
+                ], ignore_index=True)
+            else:
+                st.error("This participant has already been marked as dropped between events.")
+                st.stop()
+        # Invalidate views derived from the drop data
+        mark_drop_data_changed()
+        # Update ALL subsequent event records for this team to reflect the drop
+        recompute_subsequent_events(team_name, team_size, day, event_number)
+        st.success(f"{participant} marked as dropped between events")
+        # Save session
+        save_session_state()
+        # Need to rerun to refresh the UI
+        st.rerun()
+    except Exception as e:
+        st.error(f"Error recording between-event drop: {str(e)}")
+
+@st.fragment
+def render_drops_tab(team_name, team_roster, team_size, day, event_number, event_name,
+                     adjusted_initial_participants, previous_drops, key_prefix=""):
+    """Render the drop management tab for a single event"""
+    st.write(f"### Manage Drops for {event_name}")
+    # Display the current participants
+    st.write("#### Current Participants")
+    try:
+        # Check once whether this team has any drops, using the cached first-drop ranks
+        has_team_drops = not st.session_state.drop_data.empty and len(get_team_first_drops(team_name)[0]) > 0
+        # Get drops from previous events (earlier days or earlier events on same day)
+        previous_drops_df = EMPTY_FRAME
+        if has_team_drops:
+            previous_drops_df = get_team_drops(team_name, day, event_number)
+            previous_drops = get_previous_drop_rosters(team_name, day, event_number)
+        # Get drops specific to this event
+        current_drops = []
+        current_drops_df = EMPTY_FRAME
+        if has_team_drops:
+            current_drops_df = get_event_drops(team_name, day, event_number, event_name)
+            current_drops = current_drops_df['Roster_Number'].tolist()
+        # Filter the team roster once, dropping those lost in previous events or in this specific event
+        dropped_rosters = set(previous_drops).union(current_drops)
+        active_participants = team_roster
+        if dropped_rosters:
+            roster_numbers = team_roster['Roster_Number'].to_numpy()
+            keep_mask = np.fromiter((number not in dropped_rosters for number in roster_numbers),
+                                    dtype=bool, count=len(roster_numbers))
+            active_participants = team_roster[keep_mask]
+        # Show the adjusted initial participants count that will be used
+        st.write(f"**Initial participants for this event: {adjusted_initial_participants}**")
+        st.write(f"**Current drops for this event: {len(current_drops)}**")
+        st.write(f"**Remaining active participants: {adjusted_initial_participants - len(current_drops)}**")
+        # Show the active participants with drop option
+        if not active_participants.empty:
+            st.write(f"{len(active_participants)} active participants for this event:")
+            # Create a selection for the participant to drop
+            with st.form(f"drop_form_{key_prefix}{day}_{event_number}"):
+                # Select a participant to drop
+                participant_options = active_participants['Candidate_Name'].tolist()
+                if participant_options:
+                    drop_participant = st.selectbox(
+                        "Select participant to mark as dropped:",
+                        options=participant_options,
+                        key=f"drop_participant_{key_prefix}{day}_{event_number}"
+                    )
+                    # Get the roster number by the selected option's position instead of a mask scan
+                    drop_roster_number = active_participants['Roster_Number'].iat[participant_options.index(drop_participant)]
+                    # Create a unique session state key for this drop time
+                    drop_time_key = f"drop_time_{key_prefix}{team_name}_{day}_{event_number}"
+                    # Initialize session state for this drop time if it doesn't exist
+                    if drop_time_key not in st.session_state:
+                        # Default to empty
+                        st.session_state[drop_time_key] = ""
+                    # Enter drop time using session state to persist the value
+                    drop_time = st.text_input(
+                        "Drop Time (MMM:SS from event start)",
+                        key=drop_time_key,  # This key connects to the session state
+                        placeholder="e.g., 045:30"
+                    )
+                    # Submit button
+                    drop_submit = st.form_submit_button("Record Drop")
+                    if drop_submit:
+                        if drop_time:
+                            handle_add_drop(
+                                team_name, team_size, day, event_number, event_name,
+                                drop_participant, drop_roster_number, drop_time
+                            )
+                        else:
+                            st.error("Please enter a valid drop time.")
+                else:
+                    st.write("No participants available to drop.")
+            # Display current active participants in a table format
+            st.write("#### Active Participants List")
+            active_display = active_participants[['Candidate_Name', 'Candidate_Type', 'Roster_Number']]
+            active_display.columns = ['Participant', 'Type', 'Roster #']
+            st.dataframe(active_display)
+        else:
+            if previous_drops:
+                st.warning(f"Initial participants for this event: {adjusted_initial_participants}")
+                if len(current_drops) == adjusted_initial_participants:
+                    st.info("All participants have dropped from this event.")
+                else:
+                    st.info("No active participants remaining for this event.")
+            else:
+                st.info("All participants have dropped from this event.")
+        # If there are participants who dropped from previous events, show them
+        if previous_drops:
+            st.write("#### Participants Dropped from Previous Events")
+            if not previous_drops_df.empty:
+                # Group by participant to show their last drop
+                participant_last_drops = previous_drops_df.sort_values(['Day', 'Event_Number'], ascending=False)
+                participant_last_drops = participant_last_drops.drop_duplicates('Roster_Number')
+                # Create a nice display table
+                prev_drop_display = participant_last_drops[['Participant_Name', 'Day', 'Event_Number', 'Event_Name']].copy()
+                prev_drop_display.columns = ['Participant', 'Day', 'Event #', 'Dropped During']
+                prev_drop_display = prev_drop_display.sort_values(['Day', 'Event #'])
+                st.dataframe(prev_drop_display)
+                st.info(f"These {len(prev_drop_display)} participants dropped from previous events and are not eligible for this event.")
+        # Display the participants who have dropped in this specific event
+        st.write("#### Dropped Participants (This Event)")
+        if not current_drops_df.empty:
+            # Create a table of dropped participants
+            st.write(f"{len(current_drops_df)} participants have dropped from this event:")
+            # Create a dataframe for display
+            drop_display = current_drops_df[['Participant_Name', 'Drop_Time']].copy()
+            drop_display.columns = ['Participant', 'Drop Time']
+            # Display the dataframe with a "Remove" button column
+            st.dataframe(drop_display)
+            # Add a form to remove drops with a unique key
+            with st.form(f"remove_drop_form_{key_prefix}{day}_{event_number}"):
+                st.write("Remove a participant from the drop list:")
+                # Select a participant to remove from drops
+                remove_options = current_drops_df['Participant_Name'].tolist()
+                if remove_options:
+                    participant_to_remove = st.selectbox(
+                        "Select participant:",
+                        options=remove_options,
+                        key=f"remove_participant_{key_prefix}{day}_{event_number}"
+                    )
+                    # Get the roster number by the selected option's position
+                    remove_roster_number = current_drops_df['Roster_Number'].iat[remove_options.index(participant_to_remove)]
+                    # Submit button
+                    remove_submit = st.form_submit_button("Remove Drop")
+                    if remove_submit:
+                        handle_remove_drop(
+                            team_name, team_size, day, event_number, event_name,
+                            participant_to_remove, remove_roster_number
+                        )
+                else:
+                    st.write("No participants to remove.")
+        else:
+            st.info("No participants have dropped from this specific event yet.")
+    except Exception as e:
+        st.error(f"Error in drop management: {str(e)}")
+        st.info("Please try refreshing the page if you encounter issues with drop management.")
+
+@st.fragment
+def render_event_data_tab(team_name, team_size, day, event_number, event_name, event_details,
+                          existing_record, previous_drops, key_prefix="",
+                          adjusted_weight=None, adjusted_distance=None):
+    """Render the event data form for a single event and save the submitted record"""
+    # If there are difficulty adjustments, show a notice
+    if adjusted_weight is not None or adjusted_distance is not None:
+        st.info("This event has been adjusted for this team based on the difficulty balance calculations.")
+        if adjusted_weight is not None:
+            st.write(f"**Adjusted Weight:** {adjusted_weight:.1f} lbs (Original: {event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1):.1f} lbs)")
+        if adjusted_distance is not None:
+            st.write(f"**Adjusted Distance:** {adjusted_distance:.2f} km (Original: {event_details.get('Distance', 0):.2f} km)")
+    # Read the existing record's fields once as plain values
+    existing_row = existing_record.iloc[0].to_dict() if not existing_record.empty else {}
+    # Check the session tables once rather than going through st.session_state at each use
+    has_records = not st.session_state.event_records.empty
+    has_drops = not st.session_state.drop_data.empty
+    # Drops recorded during this event, shared by the preview and the submit handler
+    team_drop_data = get_event_drops(team_name, day, event_number, event_name)
+    drops = len(team_drop_data)
+    # Create a form for each event
+    with st.form(f"event_form_{key_prefix}{team_name}_{day}_{event_number}"):
+        col1, col2 = st.columns(2)
+        with col1:
+            # Display event details
+            st.write(f"**Event Name:** {event_name}")
+            time_limit = event_details.get('Time_Limit', '00:00')
+            st.write(f"**Time Limit:** {time_limit}")
+            # Get equipment details
+            equipment_key = f"equipment_{key_prefix}{day}_{event_name}_{event_number}"
+            equipment_list = st.session_state.get(equipment_key)
+            if equipment_list is None:
+                # Initialize equipment from event details or 4-day plan
+                equipment_items = load_event_equip_by_name().get(event_name)
+                if equipment_items is not None:
+                    equipment_list = equipment_items.copy()
+                else:
+                    # Fallback to basic equipment
+                    equipment_list = build_basic_equipment(event_details)
+                st.session_state[equipment_key] = equipment_list
+            # Display equipment list
+            st.write("**Equipment:**")
+            app_ratio_wts = equipment_list['AppRatioWT'].to_numpy()
+            # Apply weight adjustment if available
+            weights_scaled = False
+            if adjusted_weight is not None:
+                # Calculate adjustment factor
+                original_total = app_ratio_wts.sum()
+                if original_total > 0:
+                    adj_factor = adjusted_weight / original_total
+                    # Scale a new array so the stored equipment keeps its original weights
+                    app_ratio_wts = app_ratio_wts * adj_factor
+                    weights_scaled = True
+            # Read the equipment columns into arrays once and write edits back after the loop
+            equip_names = equipment_list['EquipmentName'].to_numpy()
+            equip_wts = equipment_list['EquipWt'].to_numpy()
+            equip_nums = equipment_list['EquipNum'].to_numpy()
+            if 'AppRatio' in equipment_list.columns:
+                app_ratios = equipment_list['AppRatio'].to_numpy()
+            else:
+                app_ratios = np.ones(len(equipment_list))
+            new_qtys = equip_nums.copy()
+            # Quantities saved in an existing record, keyed by equipment name and cached per record string
+            existing_qty_by_name = {}
+            if not existing_record.empty:
+                try:
+                    equip_details = existing_row.get('Equipment_Details', '')
+                    if equip_details:
+                        existing_qty_by_name = parse_equipment_quantities(equip_details)
+                except:
+                    pass
+            for i in range(len(equipment_list)):
+                equip_name = equip_names[i]
+                equip_wt = equip_wts[i]
+                equip_num = equip_nums[i]
+                col_name, col_weight, col_qty = st.columns([3, 1, 1])
+                with col_name:
+                    st.text(equip_name)
+                with col_weight:
+                    st.text(f"{equip_wt} lbs")
+                with col_qty:
+                    # Set default qty from existing record if available
+                    default_qty = existing_qty_by_name.get(equip_name, int(equip_num))
+                    new_qty = st.number_input(
+                        f"Qty",
+                        value=default_qty,
+                        min_value=0,
+                        key=f"qty_{key_prefix}{team_name}_{day}_{event_name}_{event_number}_{i}"
+                    )
+                    new_qtys[i] = new_qty
+            # Apply changed quantities in a single vectorized assignment
+            changed = new_qtys != equip_nums
+            if changed.any():
+                app_ratios = np.where(app_ratios > 0, app_ratios, 1)
+                app_ratio_wts = np.where(changed, (equip_wts * new_qtys) / app_ratios, app_ratio_wts)
+                # Scaled weights are only shown here, so only unadjusted edits go back to the stored equipment
+                if not weights_scaled:
+                    equipment_list['EquipNum'] = new_qtys
+                    equipment_list['AppRatioWT'] = app_ratio_wts
+            # Total weight across all items in one vectorized pass
+            total_weight = float(app_ratio_wts.sum())
+            st.markdown(f"**Total Adjusted Weight: {total_weight:.2f} lbs**")
+            # Distance input with default from existing record or event details
+            default_distance = adjusted_distance if adjusted_distance is not None else event_details.get('Distance', 0)
+            if not existing_record.empty:
+                default_distance = existing_row['Distance_km']
+            distance_km = st.number_input(
+                "Distance (km)",
+                value=float(default_distance),
+                min_value=0.0,
+                key=f"distance_{key_prefix}{team_name}_{day}_{event_name}"
+            )
+        with col2:
+            # Heat category with default from existing record
+            default_heat = 1
+            if not existing_record.empty:
+                default_heat = existing_row['Heat_Category']
+            heat_category = st.selectbox(
+                "Heat Category",
+                options=list(HEAT_CATEGORIES.keys()),
+                format_func=lambda x: HEAT_CATEGORIES[x],
+                index=int(default_heat)-1,
+                key=f"heat_{key_prefix}{team_name}_{day}_{event_name}"
+            )
+
+            # Duration input with default from existing record
+            default_duration = ""
+            if not existing_record.empty:
+                default_duration = existing_row['Time_Actual']
+            event_duration = st.text_input(
+                "Event Duration (MMM:SS)",
+                value=default_duration,
+                placeholder="e.g., 120:45",
+                key=f"duration_{key_prefix}{team_name}_{day}_{event_name}"
+            )
+
+            # Initial participants with default based on the freshly calculated value
+            # Calculate initial participants based on the ending count from the previous event
+            default_participants = team_size  # Default to full team size for the first event
+            # Determine the previous event (regardless of whether we have a record for it)
+            prev_day = day
+            prev_event_num = event_number - 1
+            # If this is the first event of the day, look at the last event of the previous day
+            if prev_event_num < 1:
+                prev_day = day - 1
+                # Assume 3 events per day as default
+                prev_event_num = 3
+                # Use the actual last event number for the previous day if one is recorded
+                if has_records:
+                    prev_event_num = get_last_event_numbers(team_name).get(prev_day, prev_event_num)
+            # Now try to find a record for this previous event
+            prev_event_records = EMPTY_FRAME
+            if has_records:
+                prev_event_records = get_team_event_records(team_name, prev_day, prev_event_num)
+            # Calculate default participants based on previous event
+            if not prev_event_records.empty:
+                # Read just the two counts from their columns rather than materializing the whole row
+                try:
+                    prev_initial = int(prev_event_records['Initial_Participants'].iat[0])
+                    prev_drops = int(prev_event_records['Drops'].iat[0])
+                    default_participants = prev_initial - prev_drops
+                    # Display info about calculation
+                    st.info(f"Initial participants calculated from previous event: {prev_initial} participants - {prev_drops} drops = {default_participants} participants")
+                except Exception as e:
+                    st.error(f"Error calculating from previous event: {str(e)}")
+                    # Fall back to default
+                    default_participants = team_size
+            else:
+                # No previous event record, calculate from drops data
+                previous_drops = []
+                if has_drops:
+                    previous_drops = get_previous_drop_rosters(team_name, day, event_number)
+                    # Calculate initial participants excluding previous drops
+                    default_participants = team_size - len(previous_drops)
+                    if len(previous_drops) > 0:
+                        st.info(f"Initial participants set to {default_participants} based on {len(previous_drops)} drops from previous events")
+            # If we have an existing record, use that value only if it was manually edited
+            if not existing_record.empty:
+                try:
+                    existing_participants = int(existing_row['Initial_Participants'])
+                    if existing_participants != default_participants:
+                        # Only use existing value if it was manually edited
+                        if existing_participants != team_size and existing_participants != (team_size - len(previous_drops)):
+                            st.warning(f"Note: This event was previously recorded with {existing_participants} initial participants.")
+                            default_participants = existing_participants
+                except Exception as e:
+                    st.error(f"Error retrieving existing participants: {str(e)}")
+            # Ensure default_participants is an integer
+            try:
+                default_participants = int(default_participants)
+            except:
+                default_participants = team_size
+                st.error(f"Error converting participants to integer. Using team size: {team_size}")
+            # Create a unique key for this field
+            field_key = f"participants_{key_prefix}{team_name}_{day}_{event_number}_{event_name}"
+            # Push the default into the field only when it is new or has been recalculated,
+            # so a value entered in the field is not overwritten on every rerun
+            applied_defaults = st.session_state.setdefault('participant_defaults', {})
+            if applied_defaults.get(field_key) != default_participants:
+                st.session_state[field_key] = default_participants
+                applied_defaults[field_key] = default_participants
+            else:
+                st.session_state.setdefault(field_key, default_participants)
+            # Display the initial participants field
+            initial_participants = st.number_input(
+                "Initial Participants",
+                value=st.session_state[field_key],  # Use the value from session state
+                min_value=0,
+                key=field_key
+            )
+            st.write(f"**Drops (automatically calculated):** {drops}")
+
+            # Preview time duration if provided, keeping the parsed minutes for the submit handler
+            time_actual_min = None
+            if event_duration:
+                try:
+                    time_actual_min = time_str_to_minutes(event_duration)
+                    st.write(f"**Duration in minutes:** {time_actual_min:.2f}")
+                except:
+                    st.warning("Please enter a valid duration in MMM:SS format")
+
+        # Submit button for this event
+        submit_button = st.form_submit_button(f"Save Event Data")
+        if submit_button:
+            if not event_duration:
+                st.error("Please enter the event duration.")
+            else:
+                try:
+                    # Get time directly from input
+                    time_actual = event_duration
+                    if time_actual_min is None:
+                        time_actual_min = time_str_to_minutes(time_actual)
+
+                    # Convert time limit to minutes for calculations
+                    time_limit_min = time_str_to_minutes(time_limit)
+
+                    # Calculate temperature multiplier based on heat category
+                    temp_multiplier = float(HEAT_MULTIPLIER[heat_category])
+
+                    # Use the modified equipment data
+                    equipment_key = f"equipment_{key_prefix}{day}_{event_name}_{event_number}"
+                    if equipment_key in st.session_state:
+                        equipment_data = st.session_state[equipment_key]
+                        # Read the weight and quantity columns once for all the reductions below
+                        equip_wts = equipment_data['EquipWt'].to_numpy()
+                        equip_nums = equipment_data['EquipNum'].to_numpy()
+                        if 'AppRatioWT' in equipment_data.columns:
+                            total_weight = equipment_data['AppRatioWT'].to_numpy().sum()
+                        else:
+                            # Fallback calculation
+                            total_weight = np.dot(equip_wts, equip_nums)
+                        # Apply weight adjustment if available
+                        if adjusted_weight is not None:
+                            total_weight = adjusted_weight
+                        # Aggregate names and quantities straight from the equipment columns
+                        equipment_names = ', '.join(equipment_data['EquipmentName'].astype(str))
+                        total_quantity = int(equip_nums.sum())
+
+                        # Store individual equipment details for reference, built from whole columns
+                        if 'AppRatio' in equipment_data.columns:
+                            app_ratios = equipment_data['AppRatio'].to_numpy()
+                        else:
+                            app_ratios = np.ones(len(equipment_data), dtype=int)
+                        item_weights = (equip_wts * equip_nums) / np.where(app_ratios > 0, app_ratios, 1)
+                        equipment_details = [
+                            {'Name': name, 'Weight': wt, 'Quantity': num, 'AppRatio': ratio, 'TotalWeight': item_wt}
+                            for name, wt, num, ratio, item_wt in zip(
+                                equipment_data['EquipmentName'].tolist(), equip_wts.tolist(),
+                                equip_nums.tolist(), app_ratios.tolist(), item_weights.tolist()
+                            )
+                        ]
+                    else:
+                        # Fallback to simple calculation
+                        total_weight = event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1)
+                        if adjusted_weight is not None:
+                            total_weight = adjusted_weight
+                        equipment_names = event_details.get('Equipment_Name', 'Generic Equipment')
+                        total_quantity = event_details.get('Number_of_Equipment', 1)
+                        equipment_details = [{
+                            'Name': event_details.get('Equipment_Name', 'Generic Equipment'),
+                            'Weight': event_details.get('Equipment_Weight', 0),
+                            'Quantity': event_details.get('Number_of_Equipment', 1),
+                            'TotalWeight': total_weight
+                        }]
+
+                    # Calculate difficulty scores
+                    initial_difficulty = calculate_initial_difficulty(
+                        temp_multiplier, total_weight, initial_participants,
+                        distance_km, time_limit_min, event_name
+                    )
+
+                    actual_difficulty = calculate_actual_difficulty(
+                        temp_multiplier, total_weight, initial_participants,
+                        distance_km, time_actual_min, drops,
+                        team_drop_data, day, event_number, event_name,
+                        "00:00"  # Start time is always 0 in the new format
+                    )
+
+                    # Create new record
+                    new_record = {
+                        'Team': team_name,
+                        'Day': day,
+                        'Event_Number': event_number,
+                        'Event_Name': event_name,
+                        'Equipment_Name': equipment_names,
+                        'Equipment_Weight': total_weight / total_quantity if total_quantity > 0 else 0,
+                        'Number_of_Equipment': total_quantity,
+                        'Distance_km': distance_km,
+                        'Heat_Category': heat_category,
+                        'Time_Limit': time_limit,
+                        'Start_Time': "00:00",  # Always start at 0
+                        'End_Time': time_actual,  # End time is the duration
+                        'Time_Actual': time_actual,
+                        'Time_Actual_Minutes': time_actual_min,
+                        'Initial_Participants': initial_participants,
+                        'Drops': drops,
+                        'Initial_Difficulty': initial_difficulty,
+                        'Actual_Difficulty': actual_difficulty,
+                        'Temperature_Multiplier': temp_multiplier,
+                        'Equipment_Details': serialize_equipment_details(equipment_details)  # Store as JSON for DataFrame
+                    }
+
+                    # Check if we already have an entry for this team, day, event number, and event name
+                    if not existing_record.empty:
+                        # Update the existing record column by column at its position, skipping row alignment
+                        event_records = st.session_state.event_records
+                        row_pos = event_records.index.get_loc(existing_record.index[0])
+                        for col_pos, col in enumerate(event_records.columns):
+                            if col in new_record:
+                                event_records.iat[row_pos, col_pos] = new_record[col]
+                        st.success(f"Event data updated for {event_name}")
+                    else:
+                        # Add new record
+                        st.session_state.event_records = categorize_event_records(pd.concat([
+                            st.session_state.event_records,
+                            pd.DataFrame([new_record])
+                        ], ignore_index=True))
+                        st.success(f"Event data recorded for {event_name}")
+                    # Invalidate views derived from the event records
+                    mark_event_records_changed()
+
+                    # Automatically save the session after recording data
+                    save_session_state()
+                    # Rerun to refresh the UI
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error saving event data: {str(e)}")
+
+@st.fragment
+def render_between_event_drop_form(team_name, team_roster, team_size, day, day_events, key_prefix=""):
+    """Render the form for recording drops that happened between events on a day"""
+    # Record drops between events
+    st.write("---")
+    st.write("### Record Drops Between Events")
+    st.info("Use this section to record participants who dropped between events (not during an event).")
+
+    # Get the list of participants who haven't already dropped
+    available_participants = team_roster.copy()
+    if not st.session_state.drop_data.empty:
+        # Distinct roster numbers this team has lost, from the cached per-team first drops
+        _, dropped_roster_numbers = get_team_first_drops(team_name)
+        if dropped_roster_numbers:
+            # Filter out already dropped participants
+            available_participants = available_participants[
+                ~available_participants['Roster_Number'].isin(dropped_roster_numbers)
+            ]
+
+    # Create a form to record between-event drops
+    with st.form(f"between_event_drop_form_{key_prefix}{day}"):
+        # Only show the form if there are available participants
+        if not available_participants.empty:
+            # Select a participant to drop
+            participant_options = available_participants['Candidate_Name'].tolist()
+            between_event_participant = st.selectbox(
+                "Select participant who dropped between events:",
+                options=participant_options,
+                key=f"between_event_participant_{key_prefix}{day}"
+            )
+            # Get the roster number by the selected option's position
+            between_event_roster_number = available_participants['Roster_Number'].iat[
+                participant_options.index(between_event_participant)
+            ]
+
+            # Select which event they dropped after, keeping the number and name as the option value
+            event_options = [(0, "Before events")]  # Add option for before any events
+            event_options.extend(enumerate(day_events, 1))
+
+            event_number, event_name = st.selectbox(
+                "When did the participant drop?",
+                options=event_options,
+                format_func=lambda option: f"Event {option[0]}: {option[1]}" if option[0] else "Before first event",
+                key=f"after_event_{key_prefix}{day}"
+            )
+
+            # Submit button
+            between_event_submit = st.form_submit_button("Record Between-Event Drop")
+
+            if between_event_submit:
+                handle_between_event_drop(
+                    team_name, team_size, day, event_number, event_name,
+                    between_event_participant, between_event_roster_number
+                )
+        else:
+            st.write("No participants available to mark as dropped between events.")
+
 # Title and description
 st.title("Team Performance Management and Analysis")
 st.markdown("Manage roster, equipment, events, and analyze team performance for a 4-day event.")
@@ -295,7 +1453,8 @@ if st.sidebar.button("Download Session to Computer"):
 
 # Upload session from computer
 uploaded_session = st.sidebar.file_uploader("Upload Session from Computer", type="zip")
-if uploaded_session is not None:
+# The uploader keeps its file across reruns, so only load each upload once
+if uploaded_session is not None and uploaded_session.file_id != st.session_state.get('uploaded_session_file_id'):
     try:
         with zipfile.ZipFile(uploaded_session) as zip_ref:
             # Extract and load all files
@@ -315,15 +1474,17 @@ if uploaded_session is not None:
             # Load event records
             if 'event_records.csv' in file_list:
                 with zip_ref.open('event_records.csv') as file:
-                    st.session_state.event_records = pd.read_csv(file)
+                    st.session_state.event_records = categorize_event_records(pd.read_csv(file))
+                    mark_event_records_changed()
             # Load drop data
             if 'drop_data.csv' in file_list:
                 with zip_ref.open('drop_data.csv') as file:
                     st.session_state.drop_data = pd.read_csv(file)
+                    mark_drop_data_changed()
             # Load reshuffled teams
             if 'reshuffled_teams.csv' in file_list:
                 with zip_ref.open('reshuffled_teams.csv') as file:
-                    st.session_state.reshuffled_teams = pd.read_csv(file)
+                    set_reshuffled_teams(pd.read_csv(file))
             # Load four day plan
             if 'four_day_plan.csv' in file_list:
                 with zip_ref.open('four_day_plan.csv') as file:
@@ -339,6 +1500,7 @@ if uploaded_session is not None:
                 with zip_ref.open('metadata.json') as file:
                     metadata = json.load(file)
                     st.session_state.session_name = metadata.get('session_name', 'uploaded_session')
+            st.session_state.uploaded_session_file_id = uploaded_session.file_id
             st.sidebar.success(f"Session '{st.session_state.session_name}' uploaded successfully!")
     except Exception as e:
         st.sidebar.error(f"Error uploading session: {str(e)}")
@@ -562,16 +1724,17 @@ with tabs[1]:
             if valid_plan:
                 # Create a structured 4-day plan
                 structured_plan = []
+                # Index the event details by name once, keeping the first row for each event
+                events_by_name = st.session_state.events_data.drop_duplicates('Event_Name').set_index(
+                    'Event_Name', drop=False
+                ).to_dict('index')
                 for day in range(1, 5):
                     # If this is the JUNK YARD day, it's a special case
                     if day == junk_yard_day:
                         event_name = 'JUNK YARD'
                         # Safely access event details
-                        junk_yard_data = st.session_state.events_data[
-                            st.session_state.events_data['Event_Name'] == event_name
-                        ]
-                        if not junk_yard_data.empty:
-                            event_details = junk_yard_data.iloc[0].to_dict()
+                        event_details = events_by_name.get(event_name)
+                        if event_details is not None:
                             plan_entry = {
                                 'Day': day,
                                 'Event_Number': 1,  # Only event for this day
@@ -588,11 +1751,8 @@ with tabs[1]:
                         # Normal day with 3 events
                         for event_num, event_name in enumerate(st.session_state.four_day_plan[day], 1):
                             # Safely access event details
-                            event_data = st.session_state.events_data[
-                                st.session_state.events_data['Event_Name'] == event_name
-                            ]
-                            if not event_data.empty:
-                                event_details = event_data.iloc[0].to_dict()
+                            event_details = events_by_name.get(event_name)
+                            if event_details is not None:
                                 plan_entry = {
                                     'Day': day,
                                     'Event_Number': event_num,
@@ -614,8 +1774,7 @@ with tabs[1]:
                 st.subheader("Structured 4 Day Plan")
                 st.dataframe(st.session_state.structured_four_day_plan)
                 # Add a download button
-                csv = st.session_state.structured_four_day_plan.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()
+                b64 = to_csv_b64(st.session_state.structured_four_day_plan)
                 href = f'<a href="data:file/csv;base64,{b64}" download="four_day_plan.csv">Download 4 Day Plan CSV</a>'
                 st.markdown(href, unsafe_allow_html=True)
     else:
@@ -669,32 +1828,23 @@ with tabs[2]:
                            st.session_state.structured_four_day_plan is not None and
                            isinstance(st.session_state.structured_four_day_plan, pd.DataFrame) and
                            not st.session_state.structured_four_day_plan.empty)
-        # Prepare heat category options
-        heat_categories = {
-            1: "Heat Category 1 (no multiplier)",
-            2: "Heat Category 2 (no multiplier)",
-            3: "Heat Category 3 (no multiplier)",
-            4: "Heat Category 4 (1.15x multiplier)",
-            5: "Heat Category 5 (1.3x multiplier)"
-        }
+        # Split the 4-day plan into per-day event lists once for all day tabs
+        plan_events = get_plan_events_by_day(st.session_state.structured_four_day_plan) if has_four_day_plan else {}
+        # Checks that hold for every event on the page, evaluated once instead of per event
+        team_roster_numbers = team_roster['Roster_Number'].tolist()
+        has_drops = not st.session_state.drop_data.empty
+        has_records = not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns
+        if 'adjusted_participants' not in st.session_state:
+            st.session_state.adjusted_participants = {}
+        adjusted_participants = st.session_state.adjusted_participants
+        # Join the team's recorded events to the schedule once, keyed by day, event number and name
+        records_by_event = get_team_records_by_event(team_name) if has_records else {}
         # Create tabs for each day in the range
         day_tabs = st.tabs([f"Day {day}" for day in day_range])
         for i, day in enumerate(day_range):
             with day_tabs[i]:
                 # Get events for this day from the 4-day plan
-                day_events = []
-                event_details_by_name = {}
-                if has_four_day_plan:
-                    day_plan = st.session_state.structured_four_day_plan[
-                        st.session_state.structured_four_day_plan['Day'] == day
-                    ]
-                    if not day_plan.empty:
-                        # Sort by event number
-                        day_plan = day_plan.sort_values('Event_Number')
-                        day_events = day_plan['Event_Name'].tolist()
-                        # Create a mapping of event names to details
-                        for _, event in day_plan.iterrows():
-                            event_details_by_name[event['Event_Name']] = event
+                day_events, event_details_by_name = plan_events.get(day, ([], {}))
                 if not day_events:
                     st.warning(f"No events defined for Day {day} in the 4-day plan. Please set up the 4-day plan first.")
                     continue
@@ -708,41 +1858,18 @@ with tabs[2]:
                     adjusted_initial_participants = team_size  # Default to full team size
                     previous_drops = []
                     # Get all drops for this team across all events up to this one
-                    if not st.session_state.drop_data.empty:
-                        all_team_drops = st.session_state.drop_data[
-                            st.session_state.drop_data['Team'] == team_name
-                        ]
+                    if has_drops:
                         # Get drops from previous events (earlier days or earlier events on same day)
-                        prev_drops_query = (
-                            # Earlier day
-                            (all_team_drops['Day'] < day) |
-                            # Same day but earlier event
-                            ((all_team_drops['Day'] == day) & (all_team_drops['Event_Number'] < event_number))
-                        )
-                        previous_drops_df = all_team_drops[prev_drops_query]
-                        previous_drops = previous_drops_df['Roster_Number'].unique().tolist()
+                        previous_drops = get_previous_drop_rosters(team_name, day, event_number)
                         # Calculate adjusted participants by removing those who dropped in previous events
                         if previous_drops:
-                            # Get the participant list excluding previously dropped
-                            current_participants = team_roster.copy()
-                            current_participants = current_participants[
-                                ~current_participants['Roster_Number'].isin(previous_drops)
-                            ]
-                            adjusted_initial_participants = len(current_participants)
+                            # Count the roster members not already dropped without building the filtered roster
+                            adjusted_initial_participants = team_size - sum(number in previous_drops for number in team_roster_numbers)
                     # Store this value in session state for use in the form
-                    if 'adjusted_participants' not in st.session_state:
-                        st.session_state.adjusted_participants = {}
                     participants_key = f"{team_name}_{day}_{event_number}"
-                    st.session_state.adjusted_participants[participants_key] = adjusted_initial_participants
+                    adjusted_participants[participants_key] = adjusted_initial_participants
                     # Check if we already have a record for this event
-                    existing_record = pd.DataFrame()  # Default to empty DataFrame
-                    if not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns:
-                        existing_record = st.session_state.event_records[
-                            (st.session_state.event_records['Team'] == team_name) &
-                            (st.session_state.event_records['Day'] == day) &
-                            (st.session_state.event_records['Event_Number'] == event_number) &
-                            (st.session_state.event_records['Event_Name'] == event_name)
-                        ]
+                    existing_record = records_by_event.get((day, event_number, event_name), EMPTY_FRAME)
                     # Set the expander title based on whether we have existing data
                     if not existing_record.empty:
                         expander_title = f"Event {event_number}: {event_name} ✓"
@@ -753,1025 +1880,83 @@ with tabs[2]:
                     with st.expander(expander_title, expanded=expander_open):
                         # If we have existing data, show a summary
                         if not existing_record.empty:
-                            record = existing_record.iloc[0]
+                            record = next(existing_record.itertuples(index=False))
                             st.success("Event already recorded. You can update the data if needed.")
                             col1, col2, col3 = st.columns(3)
                             with col1:
-                                st.write("**Duration:**", record['Time_Actual'])
-                                st.write("**Distance:**", f"{record['Distance_km']} km")
+                                st.write("**Duration:**", record.Time_Actual)
+                                st.write("**Distance:**", f"{record.Distance_km} km")
                             with col2:
-                                st.write("**Heat Category:**", record['Heat_Category'])
-                                st.write("**Participants:**", record['Initial_Participants'])
+                                st.write("**Heat Category:**", record.Heat_Category)
+                                st.write("**Participants:**", record.Initial_Participants)
                             with col3:
-                                st.write("**Drops:**", record['Drops'])
-                                st.write("**Difficulty:**", f"{record['Actual_Difficulty']:.2f}")
+                                st.write("**Drops:**", record.Drops)
+                                st.write("**Difficulty:**", f"{record.Actual_Difficulty:.2f}")
                         # Create tabs for event data and drops management
                         event_data_tab, drops_tab = st.tabs(["Event Data", "Manage Drops"])
                         # Drops Management Tab
                         with drops_tab:
-                            st.write(f"### Manage Drops for {event_name}")
-                            # Display the current participants
-                            st.write("#### Current Participants")
-                            try:
-                                # Get all drops for this team across all events
-                                all_team_drops = pd.DataFrame()
-                                if not st.session_state.drop_data.empty:
-                                    all_team_drops = st.session_state.drop_data[
-                                        st.session_state.drop_data['Team'] == team_name
-                                    ]
-                                # Get drops from previous events (earlier days or earlier events on same day)
-                                previous_drops_df = pd.DataFrame()
-                                if not all_team_drops.empty:
-                                    # Previous events drops query
-                                    prev_drops_query = (
-                                        # Earlier day
-                                        (all_team_drops['Day'] < day) |
-                                        # Same day but earlier event
-                                        ((all_team_drops['Day'] == day) & (all_team_drops['Event_Number'] < event_number))
-                                    )
-                                    previous_drops_df = all_team_drops[prev_drops_query]
-                                    previous_drops = previous_drops_df['Roster_Number'].unique().tolist()
-                                # Get drops specific to this event
-                                current_drops = []
-                                current_drops_df = pd.DataFrame()
-                                if not all_team_drops.empty:
-                                    current_drops_df = all_team_drops[
-                                        (all_team_drops['Day'] == day) &
-                                        (all_team_drops['Event_Number'] == event_number) &
-                                        (all_team_drops['Event_Name'] == event_name)
-                                    ]
-                                    current_drops = current_drops_df['Roster_Number'].tolist()
-                                # Get the participant list from the team roster
-                                current_participants = team_roster.copy()
-                                # Filter out previously dropped participants
-                                if previous_drops:
-                                    current_participants = current_participants[
-                                        ~current_participants['Roster_Number'].isin(previous_drops)
-                                    ]
-                                # Further filter out those who dropped in this specific event
-                                active_participants = current_participants.copy()
-                                if current_drops:
-                                    active_participants = active_participants[
-                                        ~active_participants['Roster_Number'].isin(current_drops)
-                                    ]
-                                # Show the adjusted initial participants count that will be used
-                                st.write(f"**Initial participants for this event: {adjusted_initial_participants}**")
-                                st.write(f"**Current drops for this event: {len(current_drops)}**")
-                                st.write(f"**Remaining active participants: {adjusted_initial_participants - len(current_drops)}**")
-                                # Show the active participants with drop option
-                                if not active_participants.empty:
-                                    st.write(f"{len(active_participants)} active participants for this event:")
-                                    # Create a selection for the participant to drop
-                                    with st.form(f"drop_form_{day}_{event_number}"):
-                                        # Select a participant to drop
-                                        participant_options = active_participants['Candidate_Name'].tolist()
-                                        if participant_options:
-                                            drop_participant = st.selectbox(
-                                                "Select participant to mark as dropped:",
-                                                options=participant_options
-                                            )
-                                            # Get the roster number for this participant
-                                            drop_roster_number = active_participants[
-                                                active_participants['Candidate_Name'] == drop_participant
-                                            ]['Roster_Number'].values[0]
-                                            # Create a unique session state key for this drop time
-                                            drop_time_key = f"drop_time_{team_name}_{day}_{event_number}"
-                                            # Initialize session state for this drop time if it doesn't exist
-                                            if drop_time_key not in st.session_state:
-                                                # Default to empty
-                                                st.session_state[drop_time_key] = ""
-                                            # Enter drop time using session state to persist the value
-                                            drop_time = st.text_input(
-                                                "Drop Time (MMM:SS from event start)",
-                                                key=drop_time_key,  # This key connects to the session state
-                                                placeholder="e.g., 045:30"
-                                            )
-                                            # Submit button
-                                            drop_submit = st.form_submit_button("Record Drop")
-                                            if drop_submit:
-                                                if drop_time:
-                                                    try:
-                                                        # Add to drop data
-                                                        new_drop = {
-                                                            'Team': team_name,
-                                                            'Participant_Name': drop_participant,
-                                                            'Roster_Number': drop_roster_number,
-                                                            'Event_Name': event_name,
-                                                            'Drop_Time': drop_time,
-                                                            'Day': day,
-                                                            'Event_Number': event_number,
-                                                            'Is_Between_Events': False
-                                                        }
-                                                        # Create the drop_data DataFrame if it doesn't exist or is empty
-                                                        if 'drop_data' not in st.session_state or st.session_state.drop_data.empty:
-                                                            st.session_state.drop_data = pd.DataFrame([new_drop])
-                                                        else:
-                                                            # Check if this drop already exists
-                                                            existing_drop = st.session_state.drop_data[
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (st.session_state.drop_data['Roster_Number'] == drop_roster_number) &
-                                                                (st.session_state.drop_data['Day'] == day) &
-                                                                (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                                (st.session_state.drop_data['Event_Name'] == event_name)
-                                                            ]
-                                                            if existing_drop.empty:
-                                                                # Add the new drop
-                                                                st.session_state.drop_data = pd.concat([
-                                                                    st.session_state.drop_data,
-                                                                    pd.DataFrame([new_drop])
-                                                                ], ignore_index=True)
-                                                            else:
-                                                                # Update the existing drop
-                                                                st.session_state.drop_data.loc[existing_drop.index[0], 'Drop_Time'] = drop_time
-                                                        # Update the corresponding event record if it exists
-                                                        if not st.session_state.event_records.empty:
-                                                            event_record = st.session_state.event_records[
-                                                                (st.session_state.event_records['Team'] == team_name) &
-                                                                (st.session_state.event_records['Day'] == day) &
-                                                                (st.session_state.event_records['Event_Number'] == event_number) &
-                                                                (st.session_state.event_records['Event_Name'] == event_name)
-                                                            ]
-                                                            
-                                                            if not event_record.empty:
-                                                                # Get the current drops count
-                                                                drops_query = (
-                                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                                    (st.session_state.drop_data['Day'] == day) &
-                                                                    (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                                    (st.session_state.drop_data['Event_Name'] == event_name)
-                                                                )
-                                                                drops_count = len(st.session_state.drop_data[drops_query])
-                                                                # Update the drops count in the event record
-                                                                st.session_state.event_records.loc[event_record.index[0], 'Drops'] = drops_count
-                                                                # Recalculate the actual difficulty with the new drops count
-                                                                record = event_record.iloc[0]
-                                                                temp_multiplier = record['Temperature_Multiplier']
-                                                                total_weight = record['Equipment_Weight'] * record['Number_of_Equipment']
-                                                                initial_participants = record['Initial_Participants']
-                                                                distance_km = record['Distance_km']
-                                                                time_actual_min = record['Time_Actual_Minutes']
-                                                                # Recalculate actual difficulty
-                                                                actual_difficulty = calculate_actual_difficulty(
-                                                                    temp_multiplier, total_weight, initial_participants,
-                                                                    distance_km, time_actual_min, drops_count,
-                                                                    st.session_state.drop_data[drops_query], day, event_number, event_name,
-                                                                    "00:00"  # Start time is always 0 in the new format
-                                                                )
-                                                                # Update the actual difficulty
-                                                                st.session_state.event_records.loc[event_record.index[0], 'Actual_Difficulty'] = actual_difficulty
-                                                        # Update ALL subsequent event records for this team to reflect the drop
-                                                        if not st.session_state.event_records.empty:
-                                                            # Get all events for this team that occur after the current event
-                                                            subsequent_events = st.session_state.event_records[
-                                                                (st.session_state.event_records['Team'] == team_name) &
-                                                                (
-                                                                    # Later day
-                                                                    (st.session_state.event_records['Day'] > day) |
-                                                                    # Same day but later event
-                                                                    ((st.session_state.event_records['Day'] == day) &
-                                                                     (st.session_state.event_records['Event_Number'] > event_number))
-                                                                )
-                                                            ]
-                                                            # For each subsequent event, update the initial participants count
-                                                            for idx, event_record in subsequent_events.iterrows():
-                                                                # Calculate the updated initial participants for this subsequent event
-                                                                event_day = event_record['Day']
-                                                                event_num = event_record['Event_Number']
-                                                                # Get drops from events before this one
-                                                                prev_drops_to_event = st.session_state.drop_data[
-                                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                                    (
-                                                                        # Earlier day
-                                                                        (st.session_state.drop_data['Day'] < event_day) |
-                                                                        # Same day but earlier event
-                                                                        ((st.session_state.drop_data['Day'] == event_day) &
-                                                                         (st.session_state.drop_data['Event_Number'] < event_num))
-                                                                    )
-                                                                ]['Roster_Number'].unique()
-                                                                # Calculate new initial participants count
-                                                                updated_initial_participants = team_size - len(prev_drops_to_event)
-                                                                # Update the event record
-                                                                st.session_state.event_records.loc[idx, 'Initial_Participants'] = updated_initial_participants
-                                                                # Recalculate difficulty scores with the updated initial participants
-                                                                record = st.session_state.event_records.loc[idx]
-                                                                # Get current drop count for this event
-                                                                event_drops = st.session_state.drop_data[
-                                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                                    (st.session_state.drop_data['Day'] == event_day) &
-                                                                    (st.session_state.drop_data['Event_Number'] == event_num) &
-                                                                    (st.session_state.drop_data['Event_Name'] == record['Event_Name'])
-                                                                ]
-                                                                drops_count = len(event_drops)
-                                                                # Recalculate initial difficulty
-                                                                initial_difficulty = calculate_initial_difficulty(
-                                                                    record['Temperature_Multiplier'],
-                                                                    record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                    updated_initial_participants,
-                                                                    record['Distance_km'],
-                                                                    time_str_to_minutes(record['Time_Limit']),
-                                                                    record['Event_Name']
-                                                                )
-                                                                # Recalculate actual difficulty
-                                                                actual_difficulty = calculate_actual_difficulty(
-                                                                    record['Temperature_Multiplier'],
-                                                                    record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                    updated_initial_participants,
-                                                                    record['Distance_km'],
-                                                                    record['Time_Actual_Minutes'],
-                                                                    drops_count,
-                                                                    event_drops,
-                                                                    event_day,
-                                                                    event_num,
-                                                                    record['Event_Name'],
-                                                                    "00:00"  # Start time is always 0 in the new format
-                                                                )
-                                                                # Update difficulty scores
-                                                                st.session_state.event_records.loc[idx, 'Initial_Difficulty'] = initial_difficulty
-                                                                st.session_state.event_records.loc[idx, 'Actual_Difficulty'] = actual_difficulty
-                                                        st.success(f"{drop_participant} marked as dropped at {drop_time}")
-                                                        # Save session
-                                                        save_session_state()
-                                                        # Need to rerun to refresh the UI
-                                                        st.rerun()
-                                                    except Exception as e:
-                                                        st.error(f"Error recording drop: {str(e)}")
-                                                else:
-                                                    st.error("Please enter a valid drop time.")
-                                        else:
-                                            st.write("No participants available to drop.")
-                                    # Display current active participants in a table format
-                                    st.write("#### Active Participants List")
-                                    active_display = active_participants[['Candidate_Name', 'Candidate_Type', 'Roster_Number']]
-                                    active_display.columns = ['Participant', 'Type', 'Roster #']
-                                    st.dataframe(active_display)
-                                else:
-                                    if previous_drops:
-                                        st.warning(f"Initial participants for this event: {adjusted_initial_participants}")
-                                        if len(current_drops) == adjusted_initial_participants:
-                                            st.info("All participants have dropped from this event.")
-                                        else:
-                                            st.info("No active participants remaining for this event.")
-                                    else:
-                                        st.info("All participants have dropped from this event.")
-                                # If there are participants who dropped from previous events, show them
-                                if previous_drops:
-                                    st.write("#### Participants Dropped from Previous Events")
-                                    if not previous_drops_df.empty:
-                                        # Group by participant to show their last drop
-                                        participant_last_drops = previous_drops_df.sort_values(['Day', 'Event_Number'], ascending=False)
-                                        participant_last_drops = participant_last_drops.drop_duplicates('Roster_Number')
-                                        # Create a nice display table
-                                        prev_drop_display = participant_last_drops[['Participant_Name', 'Day', 'Event_Number', 'Event_Name']].copy()
-                                        prev_drop_display.columns = ['Participant', 'Day', 'Event #', 'Dropped During']
-                                        prev_drop_display = prev_drop_display.sort_values(['Day', 'Event #'])
-                                        st.dataframe(prev_drop_display)
-                                        st.info(f"These {len(prev_drop_display)} participants dropped from previous events and are not eligible for this event.")
-                                # Display the participants who have dropped in this specific event
-                                st.write("#### Dropped Participants (This Event)")
-                                if not current_drops_df.empty:
-                                    # Create a table of dropped participants
-                                    st.write(f"{len(current_drops_df)} participants have dropped from this event:")
-                                    # Create a dataframe for display
-                                    drop_display = current_drops_df[['Participant_Name', 'Drop_Time']].copy()
-                                    drop_display.columns = ['Participant', 'Drop Time']
-                                    # Display the dataframe with a "Remove" button column
-                                    st.dataframe(drop_display)
-                                    # Add a form to remove drops with a unique key
-                                    with st.form(f"remove_drop_form_{day}_{event_number}"):
-                                        st.write("Remove a participant from the drop list:")
-                                        # Select a participant to remove from drops
-                                        remove_options = current_drops_df['Participant_Name'].tolist()
-                                        if remove_options:
-                                            participant_to_remove = st.selectbox(
-                                                "Select participant:",
-                                                options=remove_options
-                                            )
-                                            # Get the roster number
-                                            remove_roster_number = current_drops_df[
-                                                current_drops_df['Participant_Name'] == participant_to_remove
-                                            ]['Roster_Number'].values[0]
-                                            # Submit button
-                                            remove_submit = st.form_submit_button("Remove Drop")
-                                            if remove_submit:
-                                                try:
-                                                    # Remove this drop from the drop_data
-                                                    st.session_state.drop_data = st.session_state.drop_data[
-                                                        ~((st.session_state.drop_data['Team'] == team_name) &
-                                                        (st.session_state.drop_data['Day'] == day) &
-                                                        (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                        (st.session_state.drop_data['Event_Name'] == event_name) &
-                                                        (st.session_state.drop_data['Roster_Number'] == remove_roster_number))
-                                                    ]
-                                                    # Update the corresponding event record if it exists
-                                                    if not st.session_state.event_records.empty:
-                                                        event_record = st.session_state.event_records[
-                                                            (st.session_state.event_records['Team'] == team_name) &
-                                                            (st.session_state.event_records['Day'] == day) &
-                                                            (st.session_state.event_records['Event_Number'] == event_number) &
-                                                            (st.session_state.event_records['Event_Name'] == event_name)
-                                                        ]
-                                                        if not event_record.empty:
-                                                            # Recalculate the current drops count
-                                                            drops_query = (
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (st.session_state.drop_data['Day'] == day) &
-                                                                (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                                (st.session_state.drop_data['Event_Name'] == event_name)
-                                                            )
-                                                            drops_count = len(st.session_state.drop_data[drops_query])
-                                                            # Update the drops count in the event record
-                                                            st.session_state.event_records.loc[event_record.index[0], 'Drops'] = drops_count
-                                                            # Recalculate the actual difficulty with the updated drops count
-                                                            record = event_record.iloc[0]
-                                                            temp_multiplier = record['Temperature_Multiplier']
-                                                            total_weight = record['Equipment_Weight'] * record['Number_of_Equipment']
-                                                            initial_participants = record['Initial_Participants']
-                                                            distance_km = record['Distance_km']
-                                                            time_actual_min = record['Time_Actual_Minutes']
-                                                            # Recalculate actual difficulty
-                                                            actual_difficulty = calculate_actual_difficulty(
-                                                                temp_multiplier, total_weight, initial_participants,
-                                                                distance_km, time_actual_min, drops_count,
-                                                                st.session_state.drop_data[drops_query], day, event_number, event_name,
-                                                                "00:00"  # Start time is always 0 in the new format
-                                                            )
-                                                            # Update the actual difficulty
-                                                            st.session_state.event_records.loc[event_record.index[0], 'Actual_Difficulty'] = actual_difficulty
-                                                    # Update ALL subsequent event records for this team to reflect the removed drop
-                                                    if not st.session_state.event_records.empty:
-                                                        # Get all events for this team that occur after the current event
-                                                        subsequent_events = st.session_state.event_records[
-                                                            (st.session_state.event_records['Team'] == team_name) &
-                                                            (
-                                                                # Later day
-                                                                (st.session_state.event_records['Day'] > day) |
-                                                                # Same day but later event
-                                                                ((st.session_state.event_records['Day'] == day) &
-                                                                 (st.session_state.event_records['Event_Number'] > event_number))
-                                                            )
-                                                        ]
-                                                        # For each subsequent event, update the initial participants count
-                                                        for idx, event_record in subsequent_events.iterrows():
-                                                            # Calculate the updated initial participants for this subsequent event
-                                                            event_day = event_record['Day']
-                                                            event_num = event_record['Event_Number']
-                                                            # Get drops from events before this one
-                                                            prev_drops_to_event = st.session_state.drop_data[
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (
-                                                                    # Earlier day
-                                                                    (st.session_state.drop_data['Day'] < event_day) |
-                                                                    # Same day but earlier event
-                                                                    ((st.session_state.drop_data['Day'] == event_day) &
-                                                                     (st.session_state.drop_data['Event_Number'] < event_num))
-                                                                )
-                                                            ]['Roster_Number'].unique()
-                                                            # Calculate new initial participants count
-                                                            updated_initial_participants = team_size - len(prev_drops_to_event)
-                                                            # Update the event record
-                                                            st.session_state.event_records.loc[idx, 'Initial_Participants'] = updated_initial_participants
-                                                            # Recalculate difficulty scores with the updated initial participants
-                                                            record = st.session_state.event_records.loc[idx]
-                                                            # Get current drop count for this event
-                                                            event_drops = st.session_state.drop_data[
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (st.session_state.drop_data['Day'] == event_day) &
-                                                                (st.session_state.drop_data['Event_Number'] == event_num) &
-                                                                (st.session_state.drop_data['Event_Name'] == record['Event_Name'])
-                                                            ]
-                                                            drops_count = len(event_drops)
-                                                            # Recalculate initial difficulty
-                                                            initial_difficulty = calculate_initial_difficulty(
-                                                                record['Temperature_Multiplier'],
-                                                                record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                updated_initial_participants,
-                                                                record['Distance_km'],
-                                                                time_str_to_minutes(record['Time_Limit']),
-                                                                record['Event_Name']
-                                                            )
-                                                            # Recalculate actual difficulty
-                                                            actual_difficulty = calculate_actual_difficulty(
-                                                                record['Temperature_Multiplier'],
-                                                                record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                updated_initial_participants,
-                                                                record['Distance_km'],
-                                                                record['Time_Actual_Minutes'],
-                                                                drops_count,
-                                                                event_drops,
-                                                                event_day,
-                                                                event_num,
-                                                                record['Event_Name'],
-                                                                "00:00"  # Start time is always 0 in the new format
-                                                            )
-                                                            # Update difficulty scores
-                                                            st.session_state.event_records.loc[idx, 'Initial_Difficulty'] = initial_difficulty
-                                                            st.session_state.event_records.loc[idx, 'Actual_Difficulty'] = actual_difficulty
-                                                    st.success(f"Removed drop for {participant_to_remove}")
-                                                    # Save session and refresh
-                                                    save_session_state()
-                                                    st.rerun()
-                                                except Exception as e:
-                                                    st.error(f"Error removing drop: {str(e)}")
-                                        else:
-                                            st.write("No participants to remove.")
-                                else:
-                                    st.info("No participants have dropped from this specific event yet.")
-                            except Exception as e:
-                                st.error(f"Error in drop management: {str(e)}")
-                                st.info("Please try refreshing the page if you encounter issues with drop management.")
+                            render_drops_tab(
+                                team_name, team_roster, team_size, day, event_number, event_name,
+                                adjusted_initial_participants, previous_drops
+                            )
                         # Event Data Tab
                         with event_data_tab:
-                            # Create a form for each event
-                            with st.form(f"event_form_{team_name}_{day}_{event_number}"):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    # Display event details
-                                    st.write(f"**Event Name:** {event_name}")
-                                    time_limit = event_details.get('Time_Limit', '00:00')
-                                    st.write(f"**Time Limit:** {time_limit}")
-                                    # Get equipment details
-                                    equipment_key = f"equipment_{day}_{event_name}_{event_number}"
-                                    if equipment_key not in st.session_state:
-                                        # Initialize equipment from event details or 4-day plan
-                                        event_equipment = load_event_equip_data()
-                                        if not event_equipment.empty and 'EventName' in event_equipment.columns:
-                                            if event_name in event_equipment['EventName'].values:
-                                                event_id = event_equipment[event_equipment['EventName'] == event_name]['EventID'].unique()[0]
-                                                equipment_items = event_equipment[event_equipment['EventID'] == event_id]
-                                                st.session_state[equipment_key] = equipment_items.copy()
-                                            else:
-                                                # Fallback to basic equipment
-                                                basic_equipment = pd.DataFrame([{
-                                                    'EquipmentName': event_details.get('Equipment_Name', 'Generic Equipment'),
-                                                    'EquipWt': event_details.get('Equipment_Weight', 0),
-                                                    'EquipNum': event_details.get('Number_of_Equipment', 1),
-                                                    'AppRatio': 1,
-                                                    'AppRatioWT': event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1)
-                                                }])
-                                                st.session_state[equipment_key] = basic_equipment
-                                        else:
-                                            # Fallback to basic equipment
-                                            basic_equipment = pd.DataFrame([{
-                                                'EquipmentName': event_details.get('Equipment_Name', 'Generic Equipment'),
-                                                'EquipWt': event_details.get('Equipment_Weight', 0),
-                                                'EquipNum': event_details.get('Number_of_Equipment', 1),
-                                                'AppRatio': 1,
-                                                'AppRatioWT': event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1)
-                                            }])
-                                            st.session_state[equipment_key] = basic_equipment
-                                    # Display equipment list
-                                    st.write("**Equipment:**")
-                                    equipment_list = st.session_state[equipment_key]
-                                    total_weight = 0
-                                    for i, equip in enumerate(equipment_list.iterrows()):
-                                        equip_idx = equip[0]
-                                        equip = equip[1]
-                                        col_name, col_weight, col_qty = st.columns([3, 1, 1])
-                                        with col_name:
-                                            st.text(equip['EquipmentName'])
-                                        with col_weight:
-                                            st.text(f"{equip['EquipWt']} lbs")
-                                        with col_qty:
-                                            # Set default qty from existing record if available
-                                            default_qty = int(equip['EquipNum'])
-                                            if not existing_record.empty:
-                                                # Try to parse equipment details from existing record
-                                                try:
-                                                    equip_details = existing_record.iloc[0].get('Equipment_Details', '')
-                                                    if equip_details:
-                                                        import json
-                                                        equip_details = json.loads(equip_details.replace("'", "\""))
-                                                        for item in equip_details:
-                                                            if item['Name'] == equip['EquipmentName']:
-                                                                default_qty = int(item['Quantity'])
-                                                                break
-                                                except:
-                                                    pass
-                                            new_qty = st.number_input(
-                                                f"Qty",
-                                                value=default_qty,
-                                                min_value=0,
-                                                key=f"qty_{team_name}_{day}_{event_name}_{event_number}_{i}"
-                                            )
-                                            if new_qty != equip['EquipNum']:
-                                                equipment_list.at[equip_idx, 'EquipNum'] = new_qty
-                                                app_ratio = equip['AppRatio'] if 'AppRatio' in equip and equip['AppRatio'] > 0 else 1
-                                                equipment_list.at[equip_idx, 'AppRatioWT'] = (equip['EquipWt'] * new_qty) / app_ratio
-                                        # Calculate total for this item
-                                        item_total = equipment_list.at[equip_idx, 'AppRatioWT']
-                                        total_weight += item_total
-                                    st.markdown(f"**Total Adjusted Weight: {total_weight:.2f} lbs**")
-                                    # Distance input with default from existing record or event details
-                                    default_distance = event_details.get('Distance', 0)
-                                    if not existing_record.empty:
-                                        default_distance = existing_record.iloc[0]['Distance_km']
-                                    distance_km = st.number_input(
-                                        "Distance (km)",
-                                        value=float(default_distance),
-                                        min_value=0.0,
-                                        key=f"distance_{team_name}_{day}_{event_name}"
-                                    )
-                                with col2:
-                                    # Heat category with default from existing record
-                                    default_heat = 1
-                                    if not existing_record.empty:
-                                        default_heat = existing_record.iloc[0]['Heat_Category']
-                                    heat_category = st.selectbox(
-                                        "Heat Category",
-                                        options=list(heat_categories.keys()),
-                                        format_func=lambda x: heat_categories[x],
-                                        index=default_heat-1,
-                                        key=f"heat_{team_name}_{day}_{event_name}"
-                                    )
-                                    
-                                    # Duration input with default from existing record
-                                    default_duration = ""
-                                    if not existing_record.empty:
-                                        default_duration = existing_record.iloc[0]['Time_Actual']
-                                    event_duration = st.text_input(
-                                        "Event Duration (MMM:SS)",
-                                        value=default_duration,
-                                        placeholder="e.g., 120:45",
-                                        key=f"duration_{team_name}_{day}_{event_name}"
-                                    )
-                                    
-                                    # Initial participants with default based on the freshly calculated value
-                                    # Calculate initial participants based on the ending count from the previous event
-                                    default_participants = team_size  # Default to full team size for the first event
-                                    # Determine the previous event (regardless of whether we have a record for it)
-                                    prev_day = day
-                                    prev_event_num = event_number - 1
-                                    # If this is the first event of the day, look at the last event of the previous day
-                                    if prev_event_num < 1:
-                                        prev_day = day - 1
-                                        # Assume 3 events per day as default
-                                        prev_event_num = 3
-                                        # Try to find the actual last event number for the previous day
-                                        if not st.session_state.event_records.empty:
-                                            prev_day_events = st.session_state.event_records[
-                                                (st.session_state.event_records['Team'] == team_name) &
-                                                (st.session_state.event_records['Day'] == prev_day)
-                                            ]
-                                            if not prev_day_events.empty:
-                                                prev_event_num = int(prev_day_events['Event_Number'].max())
-                                    # Now try to find a record for this previous event
-                                    previous_event_record = None
-                                    if not st.session_state.event_records.empty:
-                                        prev_event_records = st.session_state.event_records[
-                                            (st.session_state.event_records['Team'] == team_name) &
-                                            (st.session_state.event_records['Day'] == prev_day) &
-                                            (st.session_state.event_records['Event_Number'] == prev_event_num)
-                                        ]
-                                        if not prev_event_records.empty:
-                                            previous_event_record = prev_event_records.iloc[0]
-                                    # Calculate default participants based on previous event
-                                    if previous_event_record is not None:
-                                        # Extract values as scalars (not Series)
-                                        try:
-                                            prev_initial = int(previous_event_record['Initial_Participants'])
-                                            prev_drops = int(previous_event_record['Drops'])
-                                            default_participants = prev_initial - prev_drops
-                                            # Display info about calculation
-                                            st.info(f"Initial participants calculated from previous event: {prev_initial} participants - {prev_drops} drops = {default_participants} participants")
-                                        except Exception as e:
-                                            st.error(f"Error calculating from previous event: {str(e)}")
-                                            # Fall back to default
-                                            default_participants = team_size
-                                    else:
-                                        # No previous event record, calculate from drops data
-                                        previous_drops = []
-                                        if not st.session_state.drop_data.empty:
-                                            prev_drops_query = (
-                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                (
-                                                    # Earlier day
-                                                    (st.session_state.drop_data['Day'] < day) |
-                                                    # Same day but earlier event
-                                                    ((st.session_state.drop_data['Day'] == day) &
-                                                     (st.session_state.drop_data['Event_Number'] < event_number))
-                                                )
-                                            )
-                                            if not st.session_state.drop_data[prev_drops_query].empty:
-                                                previous_drops = st.session_state.drop_data[prev_drops_query]['Roster_Number'].unique().tolist()
-                                            # Calculate initial participants excluding previous drops
-                                            default_participants = team_size - len(previous_drops)
-                                            if len(previous_drops) > 0:
-                                                st.info(f"Initial participants set to {default_participants} based on {len(previous_drops)} drops from previous events")
-                                    # If we have an existing record, use that value only if it was manually edited
-                                    if not existing_record.empty:
-                                        try:
-                                            existing_participants = int(existing_record.iloc[0]['Initial_Participants'])
-                                            if existing_participants != default_participants:
-                                                # Only use existing value if it was manually edited
-                                                if existing_participants != team_size and existing_participants != (team_size - len(previous_drops if 'previous_drops' in locals() else [])):
-                                                    st.warning(f"Note: This event was previously recorded with {existing_participants} initial participants.")
-                                                    default_participants = existing_participants
-                                        except Exception as e:
-                                            st.error(f"Error retrieving existing participants: {str(e)}")
-                                    # Ensure default_participants is an integer
-                                    try:
-                                        default_participants = int(default_participants)
-                                    except:
-                                        default_participants = team_size
-                                        st.error(f"Error converting participants to integer. Using team size: {team_size}")
-                                    # Create a unique key for this field
-                                    field_key = f"participants_{team_name}_{day}_{event_number}_{event_name}"
-                                    # Force update the session state for this input field to ensure it shows the correct value
-                                    if field_key not in st.session_state or st.session_state[field_key] != default_participants:
-                                        st.session_state[field_key] = default_participants
-                                    # Display the initial participants field
-                                    initial_participants = st.number_input(
-                                        "Initial Participants",
-                                        value=st.session_state[field_key],  # Use the value from session state
-                                        min_value=0,
-                                        key=field_key
-                                    )
-                                    # Get current drop count from drop data
-                                    drops = 0
-                                    if not st.session_state.drop_data.empty:
-                                        drops_query = (
-                                            (st.session_state.drop_data['Team'] == team_name) &
-                                            (st.session_state.drop_data['Day'] == day) &
-                                            (st.session_state.drop_data['Event_Number'] == event_number) &
-                                            (st.session_state.drop_data['Event_Name'] == event_name)
-                                        )
-                                        drops = len(st.session_state.drop_data[drops_query])
-                                    st.write(f"**Drops (automatically calculated):** {drops}")
-                                    
-                                    # Preview time duration if provided
-                                    if event_duration:
-                                        try:
-                                            time_actual_min = time_str_to_minutes(event_duration)
-                                            st.write(f"**Duration in minutes:** {time_actual_min:.2f}")
-                                        except:
-                                            st.warning("Please enter a valid duration in MMM:SS format")
-
-                                # Submit button for this event
-                                submit_button = st.form_submit_button(f"Save Event Data")
-                                if submit_button:
-                                    if not event_duration:
-                                        st.error("Please enter the event duration.")
-                                    else:
-                                        try:
-                                            # Get time directly from input
-                                            time_actual = event_duration
-                                            time_actual_min = time_str_to_minutes(time_actual)
-                                            
-                                            # Convert time limit to minutes for calculations
-                                            time_limit_min = time_str_to_minutes(time_limit)
-                                            
-                                            # Calculate temperature multiplier based on heat category
-                                            temp_multiplier = 1.0
-                                            if heat_category == 4:
-                                                temp_multiplier = 1.15
-                                            elif heat_category == 5:
-                                                temp_multiplier = 1.3
-                                                
-                                            # Use the modified equipment data
-                                            equipment_key = f"equipment_{day}_{event_name}_{event_number}"
-                                            if equipment_key in st.session_state:
-                                                equipment_data = st.session_state[equipment_key]
-                                                if 'AppRatioWT' in equipment_data.columns:
-                                                    total_weight = equipment_data['AppRatioWT'].sum()
-                                                else:
-                                                    # Fallback calculation
-                                                    total_weight = sum(equipment_data['EquipWt'] * equipment_data['EquipNum'])
-                                                
-                                                # Store individual equipment details for reference
-                                                equipment_details = []
-                                                for _, equip in equipment_data.iterrows():
-                                                    equipment_details.append({
-                                                        'Name': equip['EquipmentName'],
-                                                        'Weight': equip['EquipWt'],
-                                                        'Quantity': equip['EquipNum'],
-                                                        'AppRatio': equip['AppRatio'] if 'AppRatio' in equip else 1,
-                                                        'TotalWeight': (equip['EquipWt'] * equip['EquipNum']) / (equip['AppRatio'] if 'AppRatio' in equip and equip['AppRatio'] > 0 else 1)
-                                                    })
-                                            else:
-                                                # Fallback to simple calculation
-                                                total_weight = event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1)
-                                                equipment_details = [{
-                                                    'Name': event_details.get('Equipment_Name', 'Generic Equipment'),
-                                                    'Weight': event_details.get('Equipment_Weight', 0),
-                                                    'Quantity': event_details.get('Number_of_Equipment', 1),
-                                                    'TotalWeight': total_weight
-                                                }]
-                                                
-                                            # Calculate difficulty scores
-                                            initial_difficulty = calculate_initial_difficulty(
-                                                temp_multiplier, total_weight, initial_participants,
-                                                distance_km, time_limit_min, event_name
-                                            )
-                                            
-                                            # Get current drop count from drop data
-                                            drops = 0
-                                            team_drop_data = pd.DataFrame()
-                                            if not st.session_state.drop_data.empty:
-                                                drops_query = (
-                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                    (st.session_state.drop_data['Day'] == day) &
-                                                    (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                    (st.session_state.drop_data['Event_Name'] == event_name)
-                                                )
-                                                team_drop_data = st.session_state.drop_data[drops_query]
-                                                drops = len(team_drop_data)
-                                                
-                                            actual_difficulty = calculate_actual_difficulty(
-                                                temp_multiplier, total_weight, initial_participants,
-                                                distance_km, time_actual_min, drops,
-                                                team_drop_data, day, event_number, event_name,
-                                                "00:00"  # Start time is always 0 in the new format
-                                            )
-                                            
-                                            # Create new record
-                                            new_record = {
-                                                'Team': team_name,
-                                                'Day': day,
-                                                'Event_Number': event_number,
-                                                'Event_Name': event_name,
-                                                'Equipment_Name': ', '.join([ed['Name'] for ed in equipment_details]),
-                                                'Equipment_Weight': total_weight / sum([ed['Quantity'] for ed in equipment_details]) if sum([ed['Quantity'] for ed in equipment_details]) > 0 else 0,
-                                                'Number_of_Equipment': sum([ed['Quantity'] for ed in equipment_details]),
-                                                'Distance_km': distance_km,
-                                                'Heat_Category': heat_category,
-                                                'Time_Limit': time_limit,
-                                                'Start_Time': "00:00",  # Always start at 0
-                                                'End_Time': time_actual,  # End time is the duration
-                                                'Time_Actual': time_actual,
-                                                'Time_Actual_Minutes': time_actual_min,
-                                                'Initial_Participants': initial_participants,
-                                                'Drops': drops,
-                                                'Initial_Difficulty': initial_difficulty,
-                                                'Actual_Difficulty': actual_difficulty,
-                                                'Temperature_Multiplier': temp_multiplier,
-                                                'Equipment_Details': str(equipment_details)  # Store as string for DataFrame
-                                            }
-                                            
-                                            # Check if we already have an entry for this team, day, event number, and event name
-                                            if not existing_record.empty:
-                                                # Update the existing record
-                                                st.session_state.event_records.loc[existing_record.index[0]] = new_record
-                                                st.success(f"Event data updated for {event_name}")
-                                            else:
-                                                # Add new record
-                                                st.session_state.event_records = pd.concat([
-                                                    st.session_state.event_records,
-                                                    pd.DataFrame([new_record])
-                                                ], ignore_index=True)
-                                                st.success(f"Event data recorded for {event_name}")
-                                                
-                                            # Automatically save the session after recording data
-                                            save_session_state()
-                                            # Rerun to refresh the UI
-                                            st.rerun()
-                                        except Exception as e:
-                                            st.error(f"Error saving event data: {str(e)}")
+                            render_event_data_tab(
+                                team_name, team_size, day, event_number, event_name, event_details,
+                                existing_record, previous_drops
+                            )
 
                 # Record drops between events
-                st.write("---")
-                st.write("### Record Drops Between Events")
-                st.info("Use this section to record participants who dropped between events (not during an event).")
-
-                # Get the list of participants who haven't already dropped
-                available_participants = team_roster.copy()
-                if not st.session_state.drop_data.empty:
-                    # Get all drops for this team
-                    all_team_drops = st.session_state.drop_data[
-                        st.session_state.drop_data['Team'] == team_name
-                    ]
-                    # Get roster numbers of dropped participants
-                    if not all_team_drops.empty:
-                        dropped_roster_numbers = all_team_drops['Roster_Number'].unique().tolist()
-                        # Filter out already dropped participants
-                        available_participants = available_participants[
-                            ~available_participants['Roster_Number'].isin(dropped_roster_numbers)
-                        ]
-
-                # Create a form to record between-event drops
-                with st.form(f"between_event_drop_form_{day}"):
-                    # Only show the form if there are available participants
-                    if not available_participants.empty:
-                        # Select a participant to drop
-                        between_event_participant = st.selectbox(
-                            "Select participant who dropped between events:",
-                            options=available_participants['Candidate_Name'].tolist(),
-                            key=f"between_event_participant_{day}"
-                        )
-                        # Get the roster number for this participant
-                        between_event_roster_number = available_participants[
-                            available_participants['Candidate_Name'] == between_event_participant
-                        ]['Roster_Number'].values[0]
-                        
-                        # Select which event they dropped after
-                        event_options = [f"Event {i}: {name}" for i, name in enumerate(day_events, 1)]
-                        event_options.insert(0, "Before first event")  # Add option for before any events
-                        
-                        after_event = st.selectbox(
-                            "When did the participant drop?",
-                            options=event_options,
-                            key=f"after_event_{day}"
-                        )
-                        
-                        # Determine event number and name
-                        if after_event == "Before first event":
-                            event_number = 0
-                            event_name = "Before events"
-                        else:
-                            # Extract event number and name
-                            event_number = int(after_event.split(":")[0].replace("Event ", ""))
-                            event_name = after_event.split(": ")[1]
-                        
-                        # Submit button
-                        between_event_submit = st.form_submit_button("Record Between-Event Drop")
-                        
-                        if between_event_submit:
-                            try:
-                                # Create a new drop record
-                                new_drop = {
-                                    'Team': team_name,
-                                    'Participant_Name': between_event_participant,
-                                    'Roster_Number': between_event_roster_number,
-                                    'Event_Name': f"Between Events ({event_name})",
-                                    'Drop_Time': "Between Events",
-                                    'Day': day,
-                                    'Event_Number': event_number,
-                                    'Is_Between_Events': True  # Add a flag to identify between-event drops
-                                }
-                                
-                                # Add to drop data
-                                if 'drop_data' not in st.session_state or st.session_state.drop_data.empty:
-                                    st.session_state.drop_data = pd.DataFrame([new_drop])
-                                else:
-                                    # Check if this drop already exists
-                                    existing_drop = st.session_state.drop_data[
-                                        (st.session_state.drop_data['Team'] == team_name) &
-                                        (st.session_state.drop_data['Roster_Number'] == between_event_roster_number) &
-                                        (st.session_state.drop_data['Day'] == day) &
-                                        (st.session_state.drop_data['Is_Between_Events'] == True)
-                                    ]
-                                    
-                                    if existing_drop.empty:
-                                        # Add the new drop
-                                        st.session_state.drop_data = pd.concat([
-                                            st.session_state.drop_data,
-                                            pd.DataFrame([new_drop])
-                                        ], ignore_index=True)
-                                    else:
-                                        st.error("This participant has already been marked as dropped between events.")
-                                        st.stop()
-                                
-                                # Update ALL subsequent event records for this team to reflect the drop
-                                if not st.session_state.event_records.empty:
-                                    # Get all events for this team that occur after the current event
-                                    subsequent_events = st.session_state.event_records[
-                                        (st.session_state.event_records['Team'] == team_name) &
-                                        (
-                                            # Later day
-                                            (st.session_state.event_records['Day'] > day) |
-                                            # Same day but later event
-                                            ((st.session_state.event_records['Day'] == day) &
-                                             (st.session_state.event_records['Event_Number'] > event_number))
-                                        )
-                                    ]
-                                    # For each subsequent event, update the initial participants count
-                                    for idx, event_record in subsequent_events.iterrows():
-                                        # Calculate the updated initial participants for this subsequent event
-                                        event_day = event_record['Day']
-                                        event_num = event_record['Event_Number']
-                                        # Get drops from events before this one
-                                        prev_drops_to_event = st.session_state.drop_data[
-                                            (st.session_state.drop_data['Team'] == team_name) &
-                                            (
-                                                # Earlier day
-                                                (st.session_state.drop_data['Day'] < event_day) |
-                                                # Same day but earlier event
-                                                ((st.session_state.drop_data['Day'] == event_day) &
-                                                 (st.session_state.drop_data['Event_Number'] < event_num))
-                                            )
-                                        ]['Roster_Number'].unique()
-                                        # Calculate new initial participants count
-                                        updated_initial_participants = team_size - len(prev_drops_to_event)
-                                        # Update the event record
-                                        st.session_state.event_records.loc[idx, 'Initial_Participants'] = updated_initial_participants
-                                        # Recalculate difficulty scores with the updated initial participants
-                                        record = st.session_state.event_records.loc[idx]
-                                        # Get current drop count for this event
-                                        event_drops = st.session_state.drop_data[
-                                            (st.session_state.drop_data['Team'] == team_name) &
-                                            (st.session_state.drop_data['Day'] == event_day) &
-                                            (st.session_state.drop_data['Event_Number'] == event_num) &
-                                            (st.session_state.drop_data['Event_Name'] == record['Event_Name'])
-                                        ]
-                                        drops_count = len(event_drops)
-                                        # Recalculate initial difficulty
-                                        initial_difficulty = calculate_initial_difficulty(
-                                            record['Temperature_Multiplier'],
-                                            record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                            updated_initial_participants,
-                                            record['Distance_km'],
-                                            time_str_to_minutes(record['Time_Limit']),
-                                            record['Event_Name']
-                                        )
-                                        # Recalculate actual difficulty
-                                        actual_difficulty = calculate_actual_difficulty(
-                                            record['Temperature_Multiplier'],
-                                            record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                            updated_initial_participants,
-                                            record['Distance_km'],
-                                            record['Time_Actual_Minutes'],
-                                            drops_count,
-                                            event_drops,
-                                            event_day,
-                                            event_num,
-                                            record['Event_Name'],
-                                            "00:00"  # Start time is always 0 in the new format
-                                        )
-                                        # Update difficulty scores
-                                        st.session_state.event_records.loc[idx, 'Initial_Difficulty'] = initial_difficulty
-                                        st.session_state.event_records.loc[idx, 'Actual_Difficulty'] = actual_difficulty
-                                
-                                st.success(f"{between_event_participant} marked as dropped between events")
-                                # Save session
-                                save_session_state()
-                                # Need to rerun to refresh the UI
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Error recording between-event drop: {str(e)}")
-                    else:
-                        st.write("No participants available to mark as dropped between events.")
+                render_between_event_drop_form(team_name, team_roster, team_size, day, day_events)
                 
                 # After all event expanders, add a section to show completion status for this day
                 st.write("---")
                 st.write("### Day Completion Status")
                 # Check how many events are recorded for this day and team
-                recorded_events = []
-                if not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns:
-                    day_records = st.session_state.event_records[
-                        (st.session_state.event_records['Team'] == team_name) &
-                        (st.session_state.event_records['Day'] == day)
-                    ]
-                    recorded_events = day_records['Event_Name'].tolist()
-                # Display completion status for each event
+                recorded_events = set()
+                recorded_count = 0
+                if has_records:
+                    day_records = get_team_event_records(team_name, day)
+                    recorded_events = set(day_records['Event_Name'])
+                    recorded_count = len(day_records)
+                # Display completion status for each event in a single markdown block
+                status_lines = []
                 for event_idx, event_name in enumerate(day_events):
                     if event_name in recorded_events:
-                        st.write(f"✅ Event {event_idx+1}: {event_name} - **Recorded**")
+                        status_lines.append(f"✅ Event {event_idx+1}: {event_name} - **Recorded**")
                     else:
-                        st.write(f"❌ Event {event_idx+1}: {event_name} - **Not Recorded**")
+                        status_lines.append(f"❌ Event {event_idx+1}: {event_name} - **Not Recorded**")
+                st.markdown("\n\n".join(status_lines))
                 # Show completion percentage
-                completion_pct = len(recorded_events) / len(day_events) * 100 if day_events else 0
+                completion_pct = recorded_count / len(day_events) * 100 if day_events else 0
                 st.progress(completion_pct / 100)
                 st.write(f"**Day {day} Completion: {completion_pct:.0f}%**")
         # After all day tabs, show a summary of all recorded events for this team
         st.write("---")
         st.subheader(f"Summary of All Recorded Events for {team_name}")
-        if not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns:
-            team_records = st.session_state.event_records[
-                st.session_state.event_records['Team'] == team_name
-            ]
+        if has_records:
+            team_records = get_team_event_records(team_name)
             if not team_records.empty:
                 # Create a summary table
-                summary_data = []
-                for _, record in team_records.iterrows():
-                    # Count drops for this event
-                    drop_count = record['Drops']
-                    summary_data.append({
-                        'Day': record['Day'],
-                        'Event': f"Event {record['Event_Number']}: {record['Event_Name']}",
-                        'Duration': record['Time_Actual'],
-                        'Distance': f"{record['Distance_km']} km",
-                        'Heat': record['Heat_Category'],
-                        'Participants': f"{record['Initial_Participants'] - drop_count} / {record['Initial_Participants']}",
-                        'Drops': drop_count,
-                        'Difficulty': f"{record['Actual_Difficulty']:.2f}"
-                    })
-                # Convert to DataFrame and display
-                summary_df = pd.DataFrame(summary_data)
-                st.dataframe(summary_df.sort_values(['Day', 'Event']), use_container_width=True)
+                summary_df = build_event_summary(team_records)
+                st.dataframe(summary_df.sort_values(['Day', 'Event']), use_container_width=True,
+                             column_config=EVENT_SUMMARY_COLUMN_CONFIG)
                 # Add download button for team records
-                csv = team_records.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()
+                b64 = get_team_records_csv_b64(team_name, team_records)
                 href = f'<a href="data:file/csv;base64,{b64}" download="{team_name}_event_records.csv">Download {team_name} Event Records</a>'
                 st.markdown(href, unsafe_allow_html=True)
             else:
                 st.info(f"No events recorded yet for {team_name}.")
         # Show a summary of all drops for this team
         if not st.session_state.drop_data.empty:
-            team_drops = st.session_state.drop_data[
-                st.session_state.drop_data['Team'] == team_name
-            ]
+            # Slice the team's drops from the cached drop index instead of masking the whole table
+            team_drops = get_team_drops(team_name)
             if not team_drops.empty:
                 st.subheader(f"All Drops for {team_name}")
-                # Group drops by day and event
-                drop_summary = team_drops.groupby(['Day', 'Event_Number', 'Event_Name']).size().reset_index(name='Count')
-                # Create a nicer display
-                for _, drop_group in drop_summary.iterrows():
-                    st.write(f"**Day {drop_group['Day']}, Event {drop_group['Event_Number']}: {drop_group['Event_Name']}** - {drop_group['Count']} drops")
-                    # Get the drops for this event
-                    event_drops = team_drops[
-                        (team_drops['Day'] == drop_group['Day']) &
-                        (team_drops['Event_Number'] == drop_group['Event_Number']) &
-                        (team_drops['Event_Name'] == drop_group['Event_Name'])
-                    ]
+                # Group drops by day and event and display each group directly
+                for (drop_day, drop_event_number, drop_event_name), event_drops in team_drops.groupby(['Day', 'Event_Number', 'Event_Name']):
+                    st.write(f"**Day {drop_day}, Event {drop_event_number}: {drop_event_name}** - {len(event_drops)} drops")
                     # Display in a table
                     drop_display = event_drops[['Participant_Name', 'Drop_Time']].sort_values('Drop_Time')
                     drop_display.columns = ['Participant', 'Drop Time']
@@ -1793,63 +1978,52 @@ with tabs[2]:
             )
             # Filter event records by selected teams
             if selected_teams:
-                filtered_records = st.session_state.event_records[
-                    st.session_state.event_records['Team'].isin(selected_teams)
-                ]
+                filtered_records, _, _ = filter_records(tuple(selected_teams), (), ())
+                # Build each option list once and reuse it as the default
+                day_options = sorted(filtered_records['Day'].unique().tolist())
+                event_options = sorted(filtered_records['Event_Name'].unique().tolist())
                 # Add day and event type filters
                 col1, col2 = st.columns(2)
                 with col1:
                     days = st.multiselect(
                         "Filter by Days",
-                        options=sorted(filtered_records['Day'].unique().tolist()),
-                        default=sorted(filtered_records['Day'].unique().tolist())
+                        options=day_options,
+                        default=day_options
                     )
                 with col2:
                     events = st.multiselect(
                         "Filter by Events",
-                        options=sorted(filtered_records['Event_Name'].unique().tolist()),
-                        default=sorted(filtered_records['Event_Name'].unique().tolist())
+                        options=event_options,
+                        default=event_options
                     )
                 # Apply additional filters
-                if days:
-                    filtered_records = filtered_records[filtered_records['Day'].isin(days)]
-                if events:
-                    filtered_records = filtered_records[filtered_records['Event_Name'].isin(events)]
+                filtered_records, filtered_drops, drop_summary = filter_records(
+                    tuple(selected_teams), tuple(days), tuple(events)
+                )
                 # Display the filtered data
                 if not filtered_records.empty:
                     # Select which columns to display
                     display_cols = ['Team', 'Day', 'Event_Number', 'Event_Name', 'Distance_km',
                                    'Time_Actual', 'Initial_Participants', 'Drops', 'Actual_Difficulty']
-                    st.dataframe(filtered_records[display_cols], use_container_width=True)
+                    st.dataframe(get_table_page(filtered_records[display_cols], "filtered_records_page"), use_container_width=True)
                     # Add a download button for the filtered data
-                    csv = filtered_records.to_csv(index=False)
-                    b64 = base64.b64encode(csv.encode()).decode()
-                    href = f'<a href="data:file/csv;base64,{b64}" download="filtered_event_records.csv">Download Filtered Data as CSV</a>'
-                    st.markdown(href, unsafe_allow_html=True)
+                    csv_bytes = get_filtered_csv_bytes('records', tuple(selected_teams), tuple(days), tuple(events))
+                    st.download_button("Download Filtered Data as CSV", data=csv_bytes, file_name="filtered_event_records.csv",
+                                       mime="text/csv", key="download_filtered_event_records")
                     # Show drop data for the filtered teams
                     if not st.session_state.drop_data.empty:
-                        filtered_drops = st.session_state.drop_data[
-                            (st.session_state.drop_data['Team'].isin(selected_teams))
-                        ]
-                        if days:
-                            filtered_drops = filtered_drops[filtered_drops['Day'].isin(days)]
-                        if events:
-                            filtered_drops = filtered_drops[filtered_drops['Event_Name'].isin(events)]
                         if not filtered_drops.empty:
                             st.subheader("Drops for Selected Teams/Events")
-                            # Group by team, day, event
-                            drop_summary = filtered_drops.groupby(['Team', 'Day', 'Event_Number', 'Event_Name']).size().reset_index(name='Drop_Count')
                             # Display as a table
-                            drop_summary = drop_summary.sort_values(['Team', 'Day', 'Event_Number'])
                             st.dataframe(drop_summary, use_container_width=True)
                             # Option to view detailed drop data
                             if st.checkbox("View detailed drop data"):
-                                st.dataframe(filtered_drops.sort_values(['Team', 'Day', 'Event_Number', 'Drop_Time']), use_container_width=True)
+                                sorted_drops = filtered_drops.sort_values(['Team', 'Day', 'Event_Number', 'Drop_Time'])
+                                st.dataframe(get_table_page(sorted_drops, "filtered_drops_page"), use_container_width=True)
                                 # Add download button for drop data
-                                csv = filtered_drops.to_csv(index=False)
-                                b64 = base64.b64encode(csv.encode()).decode()
-                                href = f'<a href="data:file/csv;base64,{b64}" download="filtered_drop_data.csv">Download Drop Data</a>'
-                                st.markdown(href, unsafe_allow_html=True)
+                                csv_bytes = get_filtered_csv_bytes('drops', tuple(selected_teams), tuple(days), tuple(events))
+                                st.download_button("Download Drop Data", data=csv_bytes, file_name="filtered_drop_data.csv",
+                                                   mime="text/csv", key="download_filtered_drop_data")
                 else:
                     st.info("No records match the selected filters.")
             else:
@@ -1864,14 +2038,12 @@ with tabs[3]:
     st.header("Team Reshuffling After Day 2")
     # Check if we have data for Days 1 and 2
     if not st.session_state.event_records.empty:
-        days_1_2_data = st.session_state.event_records[
-            st.session_state.event_records['Day'].isin([1, 2])
-        ]
+        days_1_2_data = get_phase_records((1, 2))
         if not days_1_2_data.empty and st.session_state.roster_data is not None:
             if st.button("Reshuffle Teams for Days 3 and 4"):
                 # Get the list of participants who haven't dropped
                 if not st.session_state.drop_data.empty:
-                    all_drops = st.session_state.drop_data['Participant_Name'].unique()
+                    all_drops = frozenset(st.session_state.drop_data['Participant_Name'])
                     active_participants = st.session_state.roster_data[
                         ~st.session_state.roster_data['Candidate_Name'].isin(all_drops)
                     ]
@@ -1880,32 +2052,24 @@ with tabs[3]:
                 # Calculate difficulty scores for each team
                 if 'Team' in st.session_state.event_records.columns:
                     # Group by team and calculate average difficulty
-                    team_difficulty = days_1_2_data.groupby('Team')['Actual_Difficulty'].mean().reset_index()
+                    team_difficulty = days_1_2_data.groupby('Team', observed=True, sort=False)['Actual_Difficulty'].mean()
                     # For teams without specific data, use overall average
                     overall_avg = days_1_2_data['Actual_Difficulty'].mean()
                     # Get all teams from roster
                     all_teams = st.session_state.roster_data['Initial_Team'].unique()
-                    # Create a complete team difficulty dataframe
-                    complete_team_difficulty = []
-                    for team in all_teams:
-                        if team in team_difficulty['Team'].values:
-                            team_avg = team_difficulty[team_difficulty['Team'] == team]['Actual_Difficulty'].values[0]
-                        else:
-                            team_avg = overall_avg
-                        complete_team_difficulty.append({
-                            'Team': team,
-                            'Difficulty_Score': team_avg
-                        })
-                    team_difficulty_df = pd.DataFrame(complete_team_difficulty)
+                    # Align the averages to every roster team in one reindex
+                    team_difficulty_df = team_difficulty.reindex(
+                        pd.Index(all_teams, name='Team'), fill_value=overall_avg
+                    ).rename('Difficulty_Score').reset_index()
                 else:
                     # If no team-specific data, use overall event data
                     team_difficulty_scores = days_1_2_data.groupby(['Day', 'Event_Number'])['Actual_Difficulty'].mean().reset_index()
                     team_difficulty_df = None
                 # Reshuffle teams based on difficulty scores
-                st.session_state.reshuffled_teams = reshuffle_teams(
+                set_reshuffled_teams(reshuffle_teams(
                     active_participants,
                     team_difficulty_df
-                )
+                ))
                 st.success("Teams reshuffled successfully for Days 3 and 4!")
                 # Automatically save the session after reshuffling
                 save_session_state()
@@ -1914,10 +2078,8 @@ with tabs[3]:
                 st.subheader("New Team Assignments for Days 3 and 4")
                 st.dataframe(st.session_state.reshuffled_teams)
                 # Download button for reshuffled teams
-                csv = st.session_state.reshuffled_teams.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()
-                href = f'<a href="data:file/csv;base64,{b64}" download="reshuffled_teams.csv">Download Reshuffled Teams CSV</a>'
-                st.markdown(href, unsafe_allow_html=True)
+                st.download_button("Download Reshuffled Teams CSV", data=st.session_state.reshuffled_teams_csv,
+                                   file_name="reshuffled_teams.csv", mime="text/csv", key="download_reshuffled_teams")
         else:
             st.warning("Please record event data for Days 1 and 2 before reshuffling teams.")
     else:
@@ -1945,32 +2107,25 @@ with tabs[4]:
                            st.session_state.structured_four_day_plan is not None and
                            isinstance(st.session_state.structured_four_day_plan, pd.DataFrame) and
                            not st.session_state.structured_four_day_plan.empty)
-        # Prepare heat category options
-        heat_categories = {
-            1: "Heat Category 1 (no multiplier)",
-            2: "Heat Category 2 (no multiplier)",
-            3: "Heat Category 3 (no multiplier)",
-            4: "Heat Category 4 (1.15x multiplier)",
-            5: "Heat Category 5 (1.3x multiplier)"
-        }
+        # Split the 4-day plan into per-day event lists once for all day tabs
+        plan_events = get_plan_events_by_day(st.session_state.structured_four_day_plan) if has_four_day_plan else {}
+        # Index the difficulty adjustments by event and team once, keeping the first entry for each pair
+        adjustment_index = get_adjustment_index(st.session_state.get('team_adjustments'))
+        # Checks that hold for every event on the page, evaluated once instead of per event
+        team_roster_numbers = team_roster['Roster_Number'].tolist()
+        has_drops = not st.session_state.drop_data.empty
+        has_records = not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns
+        if 'adjusted_participants' not in st.session_state:
+            st.session_state.adjusted_participants = {}
+        adjusted_participants = st.session_state.adjusted_participants
+        # Join the team's recorded events to the schedule once, keyed by day, event number and name
+        records_by_event = get_team_records_by_event(team_name) if has_records else {}
         # Create tabs for each day in the range
         day_tabs = st.tabs([f"Day {day}" for day in day_range])
         for i, day in enumerate(day_range):
             with day_tabs[i]:
                 # Get events for this day from the 4-day plan
-                day_events = []
-                event_details_by_name = {}
-                if has_four_day_plan:
-                    day_plan = st.session_state.structured_four_day_plan[
-                        st.session_state.structured_four_day_plan['Day'] == day
-                    ]
-                    if not day_plan.empty:
-                        # Sort by event number
-                        day_plan = day_plan.sort_values('Event_Number')
-                        day_events = day_plan['Event_Name'].tolist()
-                        # Create a mapping of event names to details
-                        for _, event in day_plan.iterrows():
-                            event_details_by_name[event['Event_Name']] = event
+                day_events, event_details_by_name = plan_events.get(day, ([], {}))
                 if not day_events:
                     st.warning(f"No events defined for Day {day} in the 4-day plan. Please set up the 4-day plan first.")
                     continue
@@ -1982,52 +2137,26 @@ with tabs[4]:
                     # Check for any difficulty adjustments for this team and event
                     adjusted_weight = None
                     adjusted_distance = None
-                    if 'team_adjustments' in st.session_state and st.session_state.team_adjustments:
-                        event_key = f"{day}_{event_name}"
-                        for adj in st.session_state.team_adjustments:
-                            if adj['event_key'] == event_key and adj['team'] == team_name:
-                                adjusted_weight = adj['adjusted_weight']
-                                adjusted_distance = adj['adjusted_distance']
-                                break
+                    adj = adjustment_index.get((f"{day}_{event_name}", team_name))
+                    if adj is not None:
+                        adjusted_weight = adj['adjusted_weight']
+                        adjusted_distance = adj['adjusted_distance']
                     # Calculate adjusted initial participants based on previous events
                     adjusted_initial_participants = team_size  # Default to full team size
                     previous_drops = []
                     # Get all drops for this team across all events up to this one
-                    if not st.session_state.drop_data.empty:
-                        all_team_drops = st.session_state.drop_data[
-                            st.session_state.drop_data['Team'] == team_name
-                        ]
+                    if has_drops:
                         # Get drops from previous events (earlier days or earlier events on same day)
-                        prev_drops_query = (
-                            # Earlier day
-                            (all_team_drops['Day'] < day) |
-                            # Same day but earlier event
-                            ((all_team_drops['Day'] == day) & (all_team_drops['Event_Number'] < event_number))
-                        )
-                        previous_drops_df = all_team_drops[prev_drops_query]
-                        previous_drops = previous_drops_df['Roster_Number'].unique().tolist()
+                        previous_drops = get_previous_drop_rosters(team_name, day, event_number)
                         # Calculate adjusted participants by removing those who dropped in previous events
                         if previous_drops:
-                            # Get the participant list excluding previously dropped
-                            current_participants = team_roster.copy()
-                            current_participants = current_participants[
-                                ~current_participants['Roster_Number'].isin(previous_drops)
-                            ]
-                            adjusted_initial_participants = len(current_participants)
+                            # Count the roster members not already dropped without building the filtered roster
+                            adjusted_initial_participants = team_size - sum(number in previous_drops for number in team_roster_numbers)
                     # Store this value in session state for use in the form
-                    if 'adjusted_participants' not in st.session_state:
-                        st.session_state.adjusted_participants = {}
                     participants_key = f"{team_name}_{day}_{event_number}"
-                    st.session_state.adjusted_participants[participants_key] = adjusted_initial_participants
+                    adjusted_participants[participants_key] = adjusted_initial_participants
                     # Check if we already have a record for this event
-                    existing_record = pd.DataFrame()  # Default to empty DataFrame
-                    if not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns:
-                        existing_record = st.session_state.event_records[
-                            (st.session_state.event_records['Team'] == team_name) &
-                            (st.session_state.event_records['Day'] == day) &
-                            (st.session_state.event_records['Event_Number'] == event_number) &
-                            (st.session_state.event_records['Event_Name'] == event_name)
-                        ]
+                    existing_record = records_by_event.get((day, event_number, event_name), EMPTY_FRAME)
                     # Set the expander title based on whether we have existing data
                     if not existing_record.empty:
                         expander_title = f"Event {event_number}: {event_name} ✓"
@@ -2041,1021 +2170,88 @@ with tabs[4]:
                     with st.expander(expander_title, expanded=expander_open):
                         # If we have existing data, show a summary
                         if not existing_record.empty:
-                            record = existing_record.iloc[0]
+                            record = next(existing_record.itertuples(index=False))
                             st.success("Event already recorded. You can update the data if needed.")
                             col1, col2, col3 = st.columns(3)
                             with col1:
-                                st.write("**Duration:**", record['Time_Actual'])
-                                st.write("**Distance:**", f"{record['Distance_km']} km")
+                                st.write("**Duration:**", record.Time_Actual)
+                                st.write("**Distance:**", f"{record.Distance_km} km")
                             with col2:
-                                st.write("**Heat Category:**", record['Heat_Category'])
-                                st.write("**Participants:**", record['Initial_Participants'])
+                                st.write("**Heat Category:**", record.Heat_Category)
+                                st.write("**Participants:**", record.Initial_Participants)
                             with col3:
-                                st.write("**Drops:**", record['Drops'])
-                                st.write("**Difficulty:**", f"{record['Actual_Difficulty']:.2f}")
+                                st.write("**Drops:**", record.Drops)
+                                st.write("**Difficulty:**", f"{record.Actual_Difficulty:.2f}")
                         # Create tabs for event data and drops management
                         event_data_tab, drops_tab = st.tabs(["Event Data", "Manage Drops"])
                         # Event Data Tab
                         with event_data_tab:
-                            # If there are difficulty adjustments, show a notice
-                            if adjusted_weight is not None or adjusted_distance is not None:
-                                st.info("This event has been adjusted for this team based on the difficulty balance calculations.")
-                                if adjusted_weight is not None:
-                                    st.write(f"**Adjusted Weight:** {adjusted_weight:.1f} lbs (Original: {event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1):.1f} lbs)")
-                                if adjusted_distance is not None:
-                                    st.write(f"**Adjusted Distance:** {adjusted_distance:.2f} km (Original: {event_details.get('Distance', 0):.2f} km)")
-                            # Create a form for each event
-                            with st.form(f"event_form_days3-4_{team_name}_{day}_{event_number}"):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    # Display event details
-                                    st.write(f"**Event Name:** {event_name}")
-                                    time_limit = event_details.get('Time_Limit', '00:00')
-                                    st.write(f"**Time Limit:** {time_limit}")
-                                    # Get equipment details
-                                    equipment_key = f"equipment_days3-4_{day}_{event_name}_{event_number}"
-                                    if equipment_key not in st.session_state:
-                                        # Initialize equipment from event details or 4-day plan
-                                        event_equipment = load_event_equip_data()
-                                        if not event_equipment.empty and 'EventName' in event_equipment.columns:
-                                            if event_name in event_equipment['EventName'].values:
-                                                event_id = event_equipment[event_equipment['EventName'] == event_name]['EventID'].unique()[0]
-                                                equipment_items = event_equipment[event_equipment['EventID'] == event_id]
-                                                st.session_state[equipment_key] = equipment_items.copy()
-                                            else:
-                                                # Fallback to basic equipment
-                                                basic_equipment = pd.DataFrame([{
-                                                    'EquipmentName': event_details.get('Equipment_Name', 'Generic Equipment'),
-                                                    'EquipWt': event_details.get('Equipment_Weight', 0),
-                                                    'EquipNum': event_details.get('Number_of_Equipment', 1),
-                                                    'AppRatio': 1,
-                                                    'AppRatioWT': event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1)
-                                                }])
-                                                st.session_state[equipment_key] = basic_equipment
-                                        else:
-                                            # Fallback to basic equipment
-                                            basic_equipment = pd.DataFrame([{
-                                                'EquipmentName': event_details.get('Equipment_Name', 'Generic Equipment'),
-                                                'EquipWt': event_details.get('Equipment_Weight', 0),
-                                                'EquipNum': event_details.get('Number_of_Equipment', 1),
-                                                'AppRatio': 1,
-                                                'AppRatioWT': event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1)
-                                            }])
-                                            st.session_state[equipment_key] = basic_equipment
-                                    # Display equipment list with adjustments applied
-                                    st.write("**Equipment:**")
-                                    equipment_list = st.session_state[equipment_key].copy()
-                                    # Apply weight adjustment if available
-                                    if adjusted_weight is not None:
-                                        # Calculate adjustment factor
-                                        original_total = equipment_list['AppRatioWT'].sum()
-                                        if original_total > 0:
-                                            adj_factor = adjusted_weight / original_total
-                                            # Apply to each item
-                                            for i, (_, equip) in enumerate(equipment_list.iterrows()):
-                                                equipment_list.at[i, 'AppRatioWT'] = equip['AppRatioWT'] * adj_factor
-                                    # Display equipment
-                                    total_weight = 0
-                                    for i, equip in enumerate(equipment_list.iterrows()):
-                                        equip_idx = equip[0]
-                                        equip = equip[1]
-                                        col_name, col_weight, col_qty = st.columns([3, 1, 1])
-                                        with col_name:
-                                            st.text(equip['EquipmentName'])
-                                        with col_weight:
-                                            st.text(f"{equip['EquipWt']} lbs")
-                                        with col_qty:
-                                            # Set default qty from existing record if available
-                                            default_qty = int(equip['EquipNum'])
-                                            if not existing_record.empty:
-                                                # Try to parse equipment details from existing record
-                                                try:
-                                                    equip_details = existing_record.iloc[0].get('Equipment_Details', '')
-                                                    if equip_details:
-                                                        import json
-                                                        equip_details = json.loads(equip_details.replace("'", "\""))
-                                                        for item in equip_details:
-                                                            if item['Name'] == equip['EquipmentName']:
-                                                                default_qty = int(item['Quantity'])
-                                                                break
-                                                except:
-                                                    pass
-                                            new_qty = st.number_input(
-                                                f"Qty",
-                                                value=default_qty,
-                                                min_value=0,
-                                                key=f"qty_days3-4_{team_name}_{day}_{event_name}_{event_number}_{i}"
-                                            )
-                                            if new_qty != equip['EquipNum']:
-                                                equipment_list.at[equip_idx, 'EquipNum'] = new_qty
-                                                app_ratio = equip['AppRatio'] if 'AppRatio' in equip and equip['AppRatio'] > 0 else 1
-                                                equipment_list.at[equip_idx, 'AppRatioWT'] = (equip['EquipWt'] * new_qty) / app_ratio
-                                        # Calculate total for this item
-                                        item_total = equipment_list.at[equip_idx, 'AppRatioWT']
-                                        total_weight += item_total
-                                    st.markdown(f"**Total Adjusted Weight: {total_weight:.2f} lbs**")
-                                    # Distance input with default from existing record or adjusted value
-                                    default_distance = adjusted_distance if adjusted_distance is not None else event_details.get('Distance', 0)
-                                    if not existing_record.empty:
-                                        default_distance = existing_record.iloc[0]['Distance_km']
-                                    distance_km = st.number_input(
-                                        "Distance (km)",
-                                        value=float(default_distance),
-                                        min_value=0.0,
-                                        key=f"distance_days3-4_{team_name}_{day}_{event_name}"
-                                    )
-                                with col2:
-                                    # Heat category with default from existing record
-                                    default_heat = 1
-                                    if not existing_record.empty:
-                                        default_heat = existing_record.iloc[0]['Heat_Category']
-                                    heat_category = st.selectbox(
-                                        "Heat Category",
-                                        options=list(heat_categories.keys()),
-                                        format_func=lambda x: heat_categories[x],
-                                        index=default_heat-1,
-                                        key=f"heat_days3-4_{team_name}_{day}_{event_name}"
-                                    )
-                                    # Duration input with default from existing record
-                                    default_duration = ""
-                                    if not existing_record.empty:
-                                        default_duration = existing_record.iloc[0]['Time_Actual']
-                                    event_duration = st.text_input(
-                                        "Event Duration (MMM:SS)",
-                                        value=default_duration,
-                                        placeholder="e.g., 120:45",
-                                        key=f"duration_days3-4_{team_name}_{day}_{event_name}"
-                                    )
-                                    # Initial participants with default based on the freshly calculated value
-                                    # Calculate initial participants based on the ending count from the previous event
-                                    default_participants = team_size  # Default to full team size for the first event
-                                    # Determine the previous event (regardless of whether we have a record for it)
-                                    prev_day = day
-                                    prev_event_num = event_number - 1
-                                    # If this is the first event of the day, look at the last event of the previous day
-                                    if prev_event_num < 1:
-                                        prev_day = day - 1
-                                        # Assume 3 events per day as default
-                                        prev_event_num = 3
-                                        # Try to find the actual last event number for the previous day
-                                        if not st.session_state.event_records.empty:
-                                            prev_day_events = st.session_state.event_records[
-                                                (st.session_state.event_records['Team'] == team_name) &
-                                                (st.session_state.event_records['Day'] == prev_day)
-                                            ]
-                                            if not prev_day_events.empty:
-                                                prev_event_num = int(prev_day_events['Event_Number'].max())
-                                    # Now try to find a record for this previous event
-                                    previous_event_record = None
-                                    if not st.session_state.event_records.empty:
-                                        prev_event_records = st.session_state.event_records[
-                                            (st.session_state.event_records['Team'] == team_name) &
-                                            (st.session_state.event_records['Day'] == prev_day) &
-                                            (st.session_state.event_records['Event_Number'] == prev_event_num)
-                                        ]
-                                        if not prev_event_records.empty:
-                                            previous_event_record = prev_event_records.iloc[0]
-                                    # Calculate default participants based on previous event
-                                    if previous_event_record is not None:
-                                        # Extract values as scalars (not Series)
-                                        try:
-                                            prev_initial = int(previous_event_record['Initial_Participants'])
-                                            prev_drops = int(previous_event_record['Drops'])
-                                            default_participants = prev_initial - prev_drops
-                                            # Display info about calculation
-                                            st.info(f"Initial participants calculated from previous event: {prev_initial} participants - {prev_drops} drops = {default_participants} participants")
-                                        except Exception as e:
-                                            st.error(f"Error calculating from previous event: {str(e)}")
-                                            # Fall back to default
-                                            default_participants = team_size
-                                    else:
-                                        # No previous event record, calculate from drops data
-                                        previous_drops = []
-                                        if not st.session_state.drop_data.empty:
-                                            prev_drops_query = (
-                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                (
-                                                    # Earlier day
-                                                    (st.session_state.drop_data['Day'] < day) |
-                                                    # Same day but earlier event
-                                                    ((st.session_state.drop_data['Day'] == day) &
-                                                     (st.session_state.drop_data['Event_Number'] < event_number))
-                                                )
-                                            )
-                                            if not st.session_state.drop_data[prev_drops_query].empty:
-                                                previous_drops = st.session_state.drop_data[prev_drops_query]['Roster_Number'].unique().tolist()
-                                            # Calculate initial participants excluding previous drops
-                                            default_participants = team_size - len(previous_drops)
-                                            if len(previous_drops) > 0:
-                                                st.info(f"Initial participants set to {default_participants} based on {len(previous_drops)} drops from previous events")
-                                    # If we have an existing record, use that value only if it was manually edited
-                                    if not existing_record.empty:
-                                        try:
-                                            existing_participants = int(existing_record.iloc[0]['Initial_Participants'])
-                                            if existing_participants != default_participants:
-                                                # Only use existing value if it was manually edited
-                                                if existing_participants != team_size and existing_participants != (team_size - len(previous_drops if 'previous_drops' in locals() else [])):
-                                                    st.warning(f"Note: This event was previously recorded with {existing_participants} initial participants.")
-                                                    default_participants = existing_participants
-                                        except Exception as e:
-                                            st.error(f"Error retrieving existing participants: {str(e)}")
-                                    # Ensure default_participants is an integer
-                                    try:
-                                        default_participants = int(default_participants)
-                                    except:
-                                        default_participants = team_size
-                                        st.error(f"Error converting participants to integer. Using team size: {team_size}")
-                                    # Create a unique key for this field
-                                    field_key = f"participants_days3-4_{team_name}_{day}_{event_number}_{event_name}"
-                                    # Force update the session state for this input field to ensure it shows the correct value
-                                    if field_key not in st.session_state or st.session_state[field_key] != default_participants:
-                                        st.session_state[field_key] = default_participants
-                                    # Display the initial participants field
-                                    initial_participants = st.number_input(
-                                        "Initial Participants",
-                                        value=st.session_state[field_key],  # Use the value from session state
-                                        min_value=0,
-                                        key=field_key
-                                    )
-                                    # Get current drop count from drop data
-                                    drops = 0
-                                    if not st.session_state.drop_data.empty:
-                                        drops_query = (
-                                            (st.session_state.drop_data['Team'] == team_name) &
-                                            (st.session_state.drop_data['Day'] == day) &
-                                            (st.session_state.drop_data['Event_Number'] == event_number) &
-                                            (st.session_state.drop_data['Event_Name'] == event_name)
-                                        )
-                                        drops = len(st.session_state.drop_data[drops_query])
-                                    st.write(f"**Drops (automatically calculated):** {drops}")
-                                    # Preview time duration if provided
-                                    if event_duration:
-                                        try:
-                                            time_actual_min = time_str_to_minutes(event_duration)
-                                            st.write(f"**Duration in minutes:** {time_actual_min:.2f}")
-                                        except:
-                                            st.warning("Please enter a valid duration in MMM:SS format")
-                                # Submit button for this event
-                                submit_button = st.form_submit_button(f"Save Event Data")
-                                if submit_button:
-                                    if not event_duration:
-                                        st.error("Please enter the event duration.")
-                                    else:
-                                        try:
-                                            # Get time directly from input
-                                            time_actual = event_duration
-                                            time_actual_min = time_str_to_minutes(time_actual)
-                                            # Convert time limit to minutes for calculations
-                                            time_limit_min = time_str_to_minutes(time_limit)
-                                            # Calculate temperature multiplier based on heat category
-                                            temp_multiplier = 1.0
-                                            if heat_category == 4:
-                                                temp_multiplier = 1.15
-                                            elif heat_category == 5:
-                                                temp_multiplier = 1.3
-                                            # Use the modified equipment data
-                                            equipment_key = f"equipment_days3-4_{day}_{event_name}_{event_number}"
-                                            if equipment_key in st.session_state:
-                                                equipment_data = st.session_state[equipment_key]
-                                                if 'AppRatioWT' in equipment_data.columns:
-                                                    total_weight = equipment_data['AppRatioWT'].sum()
-                                                else:
-                                                    # Fallback calculation
-                                                    total_weight = sum(equipment_data['EquipWt'] * equipment_data['EquipNum'])
-                                                # Apply weight adjustment if available
-                                                if adjusted_weight is not None:
-                                                    total_weight = adjusted_weight
-                                                # Store individual equipment details for reference
-                                                equipment_details = []
-                                                for _, equip in equipment_data.iterrows():
-                                                    equipment_details.append({
-                                                        'Name': equip['EquipmentName'],
-                                                        'Weight': equip['EquipWt'],
-                                                        'Quantity': equip['EquipNum'],
-                                                        'AppRatio': equip['AppRatio'] if 'AppRatio' in equip else 1,
-                                                        'TotalWeight': (equip['EquipWt'] * equip['EquipNum']) / (equip['AppRatio'] if 'AppRatio' in equip and equip['AppRatio'] > 0 else 1)
-                                                    })
-                                            else:
-                                                # Fallback to simple calculation
-                                                total_weight = event_details.get('Equipment_Weight', 0) * event_details.get('Number_of_Equipment', 1)
-                                                if adjusted_weight is not None:
-                                                    total_weight = adjusted_weight
-                                                equipment_details = [{
-                                                    'Name': event_details.get('Equipment_Name', 'Generic Equipment'),
-                                                    'Weight': event_details.get('Equipment_Weight', 0),
-                                                    'Quantity': event_details.get('Number_of_Equipment', 1),
-                                                    'TotalWeight': total_weight
-                                                }]
-                                            # Calculate difficulty scores
-                                            initial_difficulty = calculate_initial_difficulty(
-                                                temp_multiplier, total_weight, initial_participants,
-                                                distance_km, time_limit_min, event_name
-                                            )
-                                            # Get current drop count from drop data
-                                            drops = 0
-                                            team_drop_data = pd.DataFrame()
-                                            if not st.session_state.drop_data.empty:
-                                                drops_query = (
-                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                    (st.session_state.drop_data['Day'] == day) &
-                                                    (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                    (st.session_state.drop_data['Event_Name'] == event_name)
-                                                )
-                                                team_drop_data = st.session_state.drop_data[drops_query]
-                                                drops = len(team_drop_data)
-                                            actual_difficulty = calculate_actual_difficulty(
-                                                temp_multiplier, total_weight, initial_participants,
-                                                distance_km, time_actual_min, drops,
-                                                team_drop_data, day, event_number, event_name,
-                                                "00:00"  # Start time is always 0 in the new format
-                                            )
-                                            # Create new record
-                                            new_record = {
-                                                'Team': team_name,
-                                                'Day': day,
-                                                'Event_Number': event_number,
-                                                'Event_Name': event_name,
-                                                'Equipment_Name': ', '.join([ed['Name'] for ed in equipment_details]),
-                                                'Equipment_Weight': total_weight / sum([ed['Quantity'] for ed in equipment_details]) if sum([ed['Quantity'] for ed in equipment_details]) > 0 else 0,
-                                                'Number_of_Equipment': sum([ed['Quantity'] for ed in equipment_details]),
-                                                'Distance_km': distance_km,
-                                                'Heat_Category': heat_category,
-                                                'Time_Limit': time_limit,
-                                                'Start_Time': "00:00",  # Always start at 0
-                                                'End_Time': time_actual,  # End time is the duration
-                                                'Time_Actual': time_actual,
-                                                'Time_Actual_Minutes': time_actual_min,
-                                                'Initial_Participants': initial_participants,
-                                                'Drops': drops,
-                                                'Initial_Difficulty': initial_difficulty,
-                                                'Actual_Difficulty': actual_difficulty,
-                                                'Temperature_Multiplier': temp_multiplier,
-                                                'Equipment_Details': str(equipment_details)  # Store as string for DataFrame
-                                            }
-                                            # Check if we already have an entry for this team, day, event number, and event name
-                                            if not existing_record.empty:
-                                                # Update the existing record
-                                                st.session_state.event_records.loc[existing_record.index[0]] = new_record
-                                                st.success(f"Event data updated for {event_name}")
-                                            else:
-                                                # Add new record
-                                                st.session_state.event_records = pd.concat([
-                                                    st.session_state.event_records,
-                                                    pd.DataFrame([new_record])
-                                                ], ignore_index=True)
-                                                st.success(f"Event data recorded for {event_name}")
-                                            # Automatically save the session after recording data
-                                            save_session_state()
-                                            # Rerun to refresh the UI
-                                            st.rerun()
-                                        except Exception as e:
-                                            st.error(f"Error saving event data: {str(e)}")
+                            render_event_data_tab(
+                                team_name, team_size, day, event_number, event_name, event_details,
+                                existing_record, previous_drops,
+                                key_prefix="days3-4_",
+                                adjusted_weight=adjusted_weight,
+                                adjusted_distance=adjusted_distance
+                            )
                         # Drops Management Tab
                         with drops_tab:
-                            st.write(f"### Manage Drops for {event_name}")
-                            # Display the current participants
-                            st.write("#### Current Participants")
-                            try:
-                                # Get all drops for this team across all events
-                                all_team_drops = pd.DataFrame()
-                                if not st.session_state.drop_data.empty:
-                                    all_team_drops = st.session_state.drop_data[
-                                        st.session_state.drop_data['Team'] == team_name
-                                    ]
-                                # Get drops from previous events (earlier days or earlier events on same day)
-                                previous_drops_df = pd.DataFrame()
-                                if not all_team_drops.empty:
-                                    # Previous events drops query
-                                    prev_drops_query = (
-                                        # Earlier day
-                                        (all_team_drops['Day'] < day) |
-                                        # Same day but earlier event
-                                        ((all_team_drops['Day'] == day) & (all_team_drops['Event_Number'] < event_number))
-                                    )
-                                    previous_drops_df = all_team_drops[prev_drops_query]
-                                    previous_drops = previous_drops_df['Roster_Number'].unique().tolist()
-                                # Get drops specific to this event
-                                current_drops = []
-                                current_drops_df = pd.DataFrame()
-                                if not all_team_drops.empty:
-                                    current_drops_df = all_team_drops[
-                                        (all_team_drops['Day'] == day) &
-                                        (all_team_drops['Event_Number'] == event_number) &
-                                        (all_team_drops['Event_Name'] == event_name)
-                                    ]
-                                    current_drops = current_drops_df['Roster_Number'].tolist()
-                                # Get the participant list from the team roster
-                                current_participants = team_roster.copy()
-                                # Filter out previously dropped participants
-                                if previous_drops_df is not None and not previous_drops_df.empty:
-                                    previous_drops = previous_drops_df['Roster_Number'].unique().tolist()
-                                    if previous_drops:
-                                        current_participants = current_participants[
-                                            ~current_participants['Roster_Number'].isin(previous_drops)
-                                        ]
-                                # Further filter out those who dropped in this specific event
-                                active_participants = current_participants.copy()
-                                if current_drops:
-                                    active_participants = active_participants[
-                                        ~active_participants['Roster_Number'].isin(current_drops)
-                                    ]
-                                # Show the adjusted initial participants count that will be used
-                                st.write(f"**Initial participants for this event: {adjusted_initial_participants}**")
-                                st.write(f"**Current drops for this event: {len(current_drops)}**")
-                                st.write(f"**Remaining active participants: {adjusted_initial_participants - len(current_drops)}**")
-                                # Show the active participants with drop option
-                                if not active_participants.empty:
-                                    st.write(f"{len(active_participants)} active participants for this event:")
-                                    # Create a selection for the participant to drop
-                                    with st.form(f"drop_form_days3-4_{day}_{event_number}"):
-                                        # Select a participant to drop
-                                        participant_options = active_participants['Candidate_Name'].tolist()
-                                        if participant_options:
-                                            drop_participant = st.selectbox(
-                                                "Select participant to mark as dropped:",
-                                                options=participant_options,
-                                                key=f"drop_participant_days3-4_{day}_{event_number}"
-                                            )
-                                            # Get the roster number for this participant
-                                            drop_roster_number = active_participants[
-                                                active_participants['Candidate_Name'] == drop_participant
-                                            ]['Roster_Number'].values[0]
-                                            # Create a unique session state key for this drop time
-                                            drop_time_key = f"drop_time_days3-4_{team_name}_{day}_{event_number}"
-                                            # Initialize session state for this drop time if it doesn't exist
-                                            if drop_time_key not in st.session_state:
-                                                # Default to empty
-                                                st.session_state[drop_time_key] = ""
-                                            # Enter drop time using session state to persist the value
-                                            drop_time = st.text_input(
-                                                "Drop Time (MMM:SS from event start)",
-                                                key=drop_time_key,  # This key connects to the session state
-                                                placeholder="e.g., 045:30"
-                                            )
-                                            # Submit button
-                                            drop_submit = st.form_submit_button("Record Drop")
-                                            if drop_submit:
-                                                if drop_time:
-                                                    try:
-                                                        # Add to drop data
-                                                        new_drop = {
-                                                            'Team': team_name,
-                                                            'Participant_Name': drop_participant,
-                                                            'Roster_Number': drop_roster_number,
-                                                            'Event_Name': event_name,
-                                                            'Drop_Time': drop_time,
-                                                            'Day': day,
-                                                            'Event_Number': event_number,
-                                                            'Is_Between_Events': False
-                                                        }
-                                                        # Create the drop_data DataFrame if it doesn't exist or is empty
-                                                        if 'drop_data' not in st.session_state or st.session_state.drop_data.empty:
-                                                            st.session_state.drop_data = pd.DataFrame([new_drop])
-                                                        else:
-                                                            # Check if this drop already exists
-                                                            existing_drop = st.session_state.drop_data[
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (st.session_state.drop_data['Roster_Number'] == drop_roster_number) &
-                                                                (st.session_state.drop_data['Day'] == day) &
-                                                                (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                                (st.session_state.drop_data['Event_Name'] == event_name)
-                                                            ]
-                                                            if existing_drop.empty:
-                                                                # Add the new drop
-                                                                st.session_state.drop_data = pd.concat([
-                                                                    st.session_state.drop_data,
-                                                                    pd.DataFrame([new_drop])
-                                                                ], ignore_index=True)
-                                                            else:
-                                                                # Update the existing drop
-                                                                st.session_state.drop_data.loc[existing_drop.index[0], 'Drop_Time'] = drop_time
-                                                        # Update the corresponding event record if it exists
-                                                        if not st.session_state.event_records.empty:
-                                                            event_record = st.session_state.event_records[
-                                                                (st.session_state.event_records['Team'] == team_name) &
-                                                                (st.session_state.event_records['Day'] == day) &
-                                                                (st.session_state.event_records['Event_Number'] == event_number) &
-                                                                (st.session_state.event_records['Event_Name'] == event_name)
-                                                            ]
-                                                            if not event_record.empty:
-                                                                # Get the current drops count
-                                                                drops_query = (
-                                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                                    (st.session_state.drop_data['Day'] == day) &
-                                                                    (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                                    (st.session_state.drop_data['Event_Name'] == event_name)
-                                                                )
-                                                                drops_count = len(st.session_state.drop_data[drops_query])
-                                                                # Update the drops count in the event record
-                                                                st.session_state.event_records.loc[event_record.index[0], 'Drops'] = drops_count
-                                                                # Recalculate the actual difficulty with the new drops count
-                                                                record = event_record.iloc[0]
-                                                                temp_multiplier = record['Temperature_Multiplier']
-                                                                total_weight = record['Equipment_Weight'] * record['Number_of_Equipment']
-                                                                initial_participants = record['Initial_Participants']
-                                                                distance_km = record['Distance_km']
-                                                                time_actual_min = record['Time_Actual_Minutes']
-                                                                # Recalculate actual difficulty
-                                                                actual_difficulty = calculate_actual_difficulty(
-                                                                    temp_multiplier, total_weight, initial_participants,
-                                                                    distance_km, time_actual_min, drops_count,
-                                                                    st.session_state.drop_data[drops_query], day, event_number, event_name,
-                                                                    "00:00"  # Start time is always 0 in the new format
-                                                                )
-                                                                # Update the actual difficulty
-                                                                st.session_state.event_records.loc[event_record.index[0], 'Actual_Difficulty'] = actual_difficulty
-                                                        # Update ALL subsequent event records for this team to reflect the drop
-                                                        if not st.session_state.event_records.empty:
-                                                            # Get all events for this team that occur after the current event
-                                                            subsequent_events = st.session_state.event_records[
-                                                                (st.session_state.event_records['Team'] == team_name) &
-                                                                (
-                                                                    # Later day
-                                                                    (st.session_state.event_records['Day'] > day) |
-                                                                    # Same day but later event
-                                                                    ((st.session_state.event_records['Day'] == day) &
-                                                                     (st.session_state.event_records['Event_Number'] > event_number))
-                                                                )
-                                                            ]
-                                                            # For each subsequent event, update the initial participants count
-                                                            for idx, event_record in subsequent_events.iterrows():
-                                                                # Calculate the updated initial participants for this subsequent event
-                                                                event_day = event_record['Day']
-                                                                event_num = event_record['Event_Number']
-                                                                # Get drops from events before this one
-                                                                prev_drops_to_event = st.session_state.drop_data[
-                                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                                    (
-                                                                        # Earlier day
-                                                                        (st.session_state.drop_data['Day'] < event_day) |
-                                                                        # Same day but earlier event
-                                                                        ((st.session_state.drop_data['Day'] == event_day) &
-                                                                         (st.session_state.drop_data['Event_Number'] < event_num))
-                                                                    )
-                                                                ]['Roster_Number'].unique()
-                                                                # Calculate new initial participants count
-                                                                updated_initial_participants = team_size - len(prev_drops_to_event)
-                                                                # Update the event record
-                                                                st.session_state.event_records.loc[idx, 'Initial_Participants'] = updated_initial_participants
-                                                                # Recalculate difficulty scores with the updated initial participants
-                                                                record = st.session_state.event_records.loc[idx]
-                                                                # Get current drop count for this event
-                                                                event_drops = st.session_state.drop_data[
-                                                                    (st.session_state.drop_data['Team'] == team_name) &
-                                                                    (st.session_state.drop_data['Day'] == event_day) &
-                                                                    (st.session_state.drop_data['Event_Number'] == event_num) &
-                                                                    (st.session_state.drop_data['Event_Name'] == record['Event_Name'])
-                                                                ]
-                                                                drops_count = len(event_drops)
-                                                                # Recalculate initial difficulty
-                                                                initial_difficulty = calculate_initial_difficulty(
-                                                                    record['Temperature_Multiplier'],
-                                                                    record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                    updated_initial_participants,
-                                                                    record['Distance_km'],
-                                                                    time_str_to_minutes(record['Time_Limit']),
-                                                                    record['Event_Name']
-                                                                )
-                                                                # Recalculate actual difficulty
-                                                                actual_difficulty = calculate_actual_difficulty(
-                                                                    record['Temperature_Multiplier'],
-                                                                    record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                    updated_initial_participants,
-                                                                    record['Distance_km'],
-                                                                    record['Time_Actual_Minutes'],
-                                                                    drops_count,
-                                                                    event_drops,
-                                                                    event_day,
-                                                                    event_num,
-                                                                    record['Event_Name'],
-                                                                    "00:00"  # Start time is always 0 in the new format
-                                                                )
-                                                                # Update difficulty scores
-                                                                st.session_state.event_records.loc[idx, 'Initial_Difficulty'] = initial_difficulty
-                                                                st.session_state.event_records.loc[idx, 'Actual_Difficulty'] = actual_difficulty
-                                                        st.success(f"{drop_participant} marked as dropped at {drop_time}")
-                                                        # Save session
-                                                        save_session_state()
-                                                        # Need to rerun to refresh the UI
-                                                        st.rerun()
-                                                    except Exception as e:
-                                                        st.error(f"Error recording drop: {str(e)}")
-                                                else:
-                                                    st.error("Please enter a valid drop time.")
-                                        else:
-                                            st.write("No participants available to drop.")
-                                    # Display current active participants in a table format
-                                    st.write("#### Active Participants List")
-                                    active_display = active_participants[['Candidate_Name', 'Candidate_Type', 'Roster_Number']]
-                                    active_display.columns = ['Participant', 'Type', 'Roster #']
-                                    st.dataframe(active_display)
-                                else:
-                                    if previous_drops_df is not None and not previous_drops_df.empty:
-                                        st.warning(f"Initial participants for this event: {adjusted_initial_participants}")
-                                        if len(current_drops) == adjusted_initial_participants:
-                                            st.info("All participants have dropped from this event.")
-                                        else:
-                                            st.info("No active participants remaining for this event.")
-                                    else:
-                                        st.info("All participants have dropped from this event.")
-                                # If there are participants who dropped from previous events, show them
-                                if previous_drops_df is not None and not previous_drops_df.empty:
-                                    st.write("#### Participants Dropped from Previous Events")
-                                    # Group by participant to show their last drop
-                                    participant_last_drops = previous_drops_df.sort_values(['Day', 'Event_Number'], ascending=False)
-                                    participant_last_drops = participant_last_drops.drop_duplicates('Roster_Number')
-                                    # Create a nice display table
-                                    prev_drop_display = participant_last_drops[['Participant_Name', 'Day', 'Event_Number', 'Event_Name']].copy()
-                                    prev_drop_display.columns = ['Participant', 'Day', 'Event #', 'Dropped During']
-                                    prev_drop_display = prev_drop_display.sort_values(['Day', 'Event #'])
-                                    st.dataframe(prev_drop_display)
-                                    st.info(f"These {len(prev_drop_display)} participants dropped from previous events and are not eligible for this event.")
-                                # Display the participants who have dropped in this specific event
-                                st.write("#### Dropped Participants (This Event)")
-                                if not current_drops_df.empty:
-                                    # Create a table of dropped participants
-                                    st.write(f"{len(current_drops_df)} participants have dropped from this event:")
-                                    # Create a dataframe for display
-                                    drop_display = current_drops_df[['Participant_Name', 'Drop_Time']].copy()
-                                    drop_display.columns = ['Participant', 'Drop Time']
-                                    # Display the dataframe with a "Remove" button column
-                                    st.dataframe(drop_display)
-                                    # Add a form to remove drops with a unique key
-                                    with st.form(f"remove_drop_form_days3-4_{day}_{event_number}"):
-                                        st.write("Remove a participant from the drop list:")
-                                        # Select a participant to remove from drops
-                                        remove_options = current_drops_df['Participant_Name'].tolist()
-                                        if remove_options:
-                                            participant_to_remove = st.selectbox(
-                                                "Select participant:",
-                                                options=remove_options,
-                                                key=f"remove_participant_days3-4_{day}_{event_number}"
-                                            )
-                                            # Get the roster number
-                                            remove_roster_number = current_drops_df[
-                                                current_drops_df['Participant_Name'] == participant_to_remove
-                                            ]['Roster_Number'].values[0]
-                                            # Submit button
-                                            remove_submit = st.form_submit_button("Remove Drop")
-                                            if remove_submit:
-                                                try:
-                                                    # Remove this drop from the drop_data
-                                                    st.session_state.drop_data = st.session_state.drop_data[
-                                                        ~((st.session_state.drop_data['Team'] == team_name) &
-                                                        (st.session_state.drop_data['Day'] == day) &
-                                                        (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                        (st.session_state.drop_data['Event_Name'] == event_name) &
-                                                        (st.session_state.drop_data['Roster_Number'] == remove_roster_number))
-                                                    ]
-                                                    # Update the corresponding event record if it exists
-                                                    if not st.session_state.event_records.empty:
-                                                        event_record = st.session_state.event_records[
-                                                            (st.session_state.event_records['Team'] == team_name) &
-                                                            (st.session_state.event_records['Day'] == day) &
-                                                            (st.session_state.event_records['Event_Number'] == event_number) &
-                                                            (st.session_state.event_records['Event_Name'] == event_name)
-                                                        ]
-                                                        if not event_record.empty:
-                                                            # Recalculate the current drops count
-                                                            drops_query = (
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (st.session_state.drop_data['Day'] == day) &
-                                                                (st.session_state.drop_data['Event_Number'] == event_number) &
-                                                                (st.session_state.drop_data['Event_Name'] == event_name)
-                                                            )
-                                                            drops_count = len(st.session_state.drop_data[drops_query])
-                                                            # Update the drops count in the event record
-                                                            st.session_state.event_records.loc[event_record.index[0], 'Drops'] = drops_count
-                                                            # Recalculate the actual difficulty with the updated drops count
-                                                            record = event_record.iloc[0]
-                                                            temp_multiplier = record['Temperature_Multiplier']
-                                                            total_weight = record['Equipment_Weight'] * record['Number_of_Equipment']
-                                                            initial_participants = record['Initial_Participants']
-                                                            distance_km = record['Distance_km']
-                                                            time_actual_min = record['Time_Actual_Minutes']
-                                                            # Recalculate actual difficulty
-                                                            actual_difficulty = calculate_actual_difficulty(
-                                                                temp_multiplier, total_weight, initial_participants,
-                                                                distance_km, time_actual_min, drops_count,
-                                                                st.session_state.drop_data[drops_query], day, event_number, event_name,
-                                                                "00:00"  # Start time is always 0 in the new format
-                                                            )
-                                                            # Update the actual difficulty
-                                                            st.session_state.event_records.loc[event_record.index[0], 'Actual_Difficulty'] = actual_difficulty
-                                                    # Update ALL subsequent event records for this team to reflect the removed drop
-                                                    if not st.session_state.event_records.empty:
-                                                        # Get all events for this team that occur after the current event
-                                                        subsequent_events = st.session_state.event_records[
-                                                            (st.session_state.event_records['Team'] == team_name) &
-                                                            (
-                                                                # Later day
-                                                                (st.session_state.event_records['Day'] > day) |
-                                                                # Same day but later event
-                                                                ((st.session_state.event_records['Day'] == day) &
-                                                                 (st.session_state.event_records['Event_Number'] > event_number))
-                                                            )
-                                                        ]
-                                                        # For each subsequent event, update the initial participants count
-                                                        for idx, event_record in subsequent_events.iterrows():
-                                                            # Calculate the updated initial participants for this subsequent event
-                                                            event_day = event_record['Day']
-                                                            event_num = event_record['Event_Number']
-                                                            # Get drops from events before this one
-                                                            prev_drops_to_event = st.session_state.drop_data[
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (
-                                                                    # Earlier day
-                                                                    (st.session_state.drop_data['Day'] < event_day) |
-                                                                    # Same day but earlier event
-                                                                    ((st.session_state.drop_data['Day'] == event_day) &
-                                                                     (st.session_state.drop_data['Event_Number'] < event_num))
-                                                                )
-                                                            ]['Roster_Number'].unique()
-                                                            # Calculate new initial participants count
-                                                            updated_initial_participants = team_size - len(prev_drops_to_event)
-                                                            # Update the event record
-                                                            st.session_state.event_records.loc[idx, 'Initial_Participants'] = updated_initial_participants
-                                                            # Recalculate difficulty scores with the updated initial participants
-                                                            record = st.session_state.event_records.loc[idx]
-                                                            # Get current drop count for this event
-                                                            event_drops = st.session_state.drop_data[
-                                                                (st.session_state.drop_data['Team'] == team_name) &
-                                                                (st.session_state.drop_data['Day'] == event_day) &
-                                                                (st.session_state.drop_data['Event_Number'] == event_num) &
-                                                                (st.session_state.drop_data['Event_Name'] == record['Event_Name'])
-                                                            ]
-                                                            drops_count = len(event_drops)
-                                                            # Recalculate initial difficulty
-                                                            initial_difficulty = calculate_initial_difficulty(
-                                                                record['Temperature_Multiplier'],
-                                                                record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                updated_initial_participants,
-                                                                record['Distance_km'],
-                                                                time_str_to_minutes(record['Time_Limit'])
-                                                            )
-                                                            # Recalculate actual difficulty
-                                                            actual_difficulty = calculate_actual_difficulty(
-                                                                record['Temperature_Multiplier'],
-                                                                record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                                                updated_initial_participants,
-                                                                record['Distance_km'],
-                                                                record['Time_Actual_Minutes'],
-                                                                drops_count,
-                                                                event_drops,
-                                                                event_day,
-                                                                event_num,
-                                                                record['Event_Name'],
-                                                                "00:00"  # Start time is always 0 in the new format
-                                                            )
-                                                            # Update difficulty scores
-                                                            st.session_state.event_records.loc[idx, 'Initial_Difficulty'] = initial_difficulty
-                                                            st.session_state.event_records.loc[idx, 'Actual_Difficulty'] = actual_difficulty
-                                                    st.success(f"Removed drop for {participant_to_remove}")
-                                                    # Save session and refresh
-                                                    save_session_state()
-                                                    st.rerun()
-                                                except Exception as e:
-                                                    st.error(f"Error removing drop: {str(e)}")
-                                        else:
-                                            st.write("No participants to remove.")
-                                else:
-                                    st.info("No participants have dropped from this specific event yet.")
-                            except Exception as e:
-                                st.error(f"Error in drop management: {str(e)}")
-                                st.info("Please try refreshing the page if you encounter issues with drop management.")
+                            render_drops_tab(
+                                team_name, team_roster, team_size, day, event_number, event_name,
+                                adjusted_initial_participants, previous_drops,
+                                key_prefix="days3-4_"
+                            )
                 # Record drops between events
-                st.write("---")
-                st.write("### Record Drops Between Events")
-                st.info("Use this section to record participants who dropped between events (not during an event).")
-                # Get the list of participants who haven't already dropped
-                available_participants = team_roster.copy()
-                if not st.session_state.drop_data.empty:
-                    # Get all drops for this team
-                    all_team_drops = st.session_state.drop_data[
-                        st.session_state.drop_data['Team'] == team_name
-                    ]
-                    # Get roster numbers of dropped participants
-                    if not all_team_drops.empty:
-                        dropped_roster_numbers = all_team_drops['Roster_Number'].unique().tolist()
-                        # Filter out already dropped participants
-                        available_participants = available_participants[
-                            ~available_participants['Roster_Number'].isin(dropped_roster_numbers)
-                        ]
-                # Create a form to record between-event drops
-                with st.form(f"between_event_drop_form_days3-4_{day}"):
-                    # Only show the form if there are available participants
-                    if not available_participants.empty:
-                        # Select a participant to drop
-                        between_event_participant = st.selectbox(
-                            "Select participant who dropped between events:",
-                            options=available_participants['Candidate_Name'].tolist(),
-                            key=f"between_event_participant_days3-4_{day}"
-                        )
-                        # Get the roster number for this participant
-                        between_event_roster_number = available_participants[
-                            available_participants['Candidate_Name'] == between_event_participant
-                        ]['Roster_Number'].values[0]
-                        # Select which event they dropped after
-                        event_options = [f"Event {i}: {name}" for i, name in enumerate(day_events, 1)]
-                        event_options.insert(0, "Before first event")  # Add option for before any events
-                        after_event = st.selectbox(
-                            "When did the participant drop?",
-                            options=event_options,
-                            key=f"after_event_days3-4_{day}"
-                        )
-                        # Determine event number and name
-                        if after_event == "Before first event":
-                            event_number = 0
-                            event_name = "Before events"
-                        else:
-                            # Extract event number and name
-                            event_number = int(after_event.split(":")[0].replace("Event ", ""))
-                            event_name = after_event.split(": ")[1]
-                        # Submit button
-                        between_event_submit = st.form_submit_button("Record Between-Event Drop")
-                        if between_event_submit:
-                            try:
-                                # Create a new drop record
-                                new_drop = {
-                                    'Team': team_name,
-                                    'Participant_Name': between_event_participant,
-                                    'Roster_Number': between_event_roster_number,
-                                    'Event_Name': f"Between Events ({event_name})",
-                                    'Drop_Time': "Between Events",
-                                    'Day': day,
-                                    'Event_Number': event_number,
-                                    'Is_Between_Events': True  # Add a flag to identify between-event drops
-                                }
-                                # Add to drop data
-                                if 'drop_data' not in st.session_state or st.session_state.drop_data.empty:
-                                    st.session_state.drop_data = pd.DataFrame([new_drop])
-                                else:
-                                    # Check if this drop already exists
-                                    existing_drop = st.session_state.drop_data[
-                                        (st.session_state.drop_data['Team'] == team_name) &
-                                        (st.session_state.drop_data['Roster_Number'] == between_event_roster_number) &
-                                        (st.session_state.drop_data['Day'] == day) &
-                                        (st.session_state.drop_data['Is_Between_Events'] == True)
-                                    ]
-                                    if existing_drop.empty:
-                                        # Add the new drop
-                                        st.session_state.drop_data = pd.concat([
-                                            st.session_state.drop_data,
-                                            pd.DataFrame([new_drop])
-                                        ], ignore_index=True)
-                                    else:
-                                        st.error("This participant has already been marked as dropped between events.")
-                                        st.stop()
-                                # Update ALL subsequent event records for this team to reflect the drop
-                                if not st.session_state.event_records.empty:
-                                    # Get all events for this team that occur after the current event
-                                    subsequent_events = st.session_state.event_records[
-                                        (st.session_state.event_records['Team'] == team_name) &
-                                        (
-                                            # Later day
-                                            (st.session_state.event_records['Day'] > day) |
-                                            # Same day but later event
-                                            ((st.session_state.event_records['Day'] == day) &
-                                             (st.session_state.event_records['Event_Number'] > event_number))
-                                        )
-                                    ]
-                                    # For each subsequent event, update the initial participants count
-                                    for idx, event_record in subsequent_events.iterrows():
-                                        # Calculate the updated initial participants for this subsequent event
-                                        event_day = event_record['Day']
-                                        event_num = event_record['Event_Number']
-                                        # Get drops from events before this one
-                                        prev_drops_to_event = st.session_state.drop_data[
-                                            (st.session_state.drop_data['Team'] == team_name) &
-                                            (
-                                                # Earlier day
-                                                (st.session_state.drop_data['Day'] < event_day) |
-                                                # Same day but earlier event
-                                                ((st.session_state.drop_data['Day'] == event_day) &
-                                                 (st.session_state.drop_data['Event_Number'] < event_num))
-                                            )
-                                        ]['Roster_Number'].unique()
-                                        # Calculate new initial participants count
-                                        updated_initial_participants = team_size - len(prev_drops_to_event)
-                                        # Update the event record
-                                        st.session_state.event_records.loc[idx, 'Initial_Participants'] = updated_initial_participants
-                                        # Recalculate difficulty scores with the updated initial participants
-                                        record = st.session_state.event_records.loc[idx]
-                                        # Get current drop count for this event
-                                        event_drops = st.session_state.drop_data[
-                                            (st.session_state.drop_data['Team'] == team_name) &
-                                            (st.session_state.drop_data['Day'] == event_day) &
-                                            (st.session_state.drop_data['Event_Number'] == event_num) &
-                                            (st.session_state.drop_data['Event_Name'] == record['Event_Name'])
-                                        ]
-                                        drops_count = len(event_drops)
-                                        # Recalculate initial difficulty
-                                        initial_difficulty = calculate_initial_difficulty(
-                                            record['Temperature_Multiplier'],
-                                            record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                            updated_initial_participants,
-                                            record['Distance_km'],
-                                            time_str_to_minutes(record['Time_Limit']),
-                                            record['Event_Name']
-                                        )
-                                        # Recalculate actual difficulty
-                                        actual_difficulty = calculate_actual_difficulty(
-                                            record['Temperature_Multiplier'],
-                                            record['Equipment_Weight'] * record['Number_of_Equipment'],
-                                            updated_initial_participants,
-                                            record['Distance_km'],
-                                            record['Time_Actual_Minutes'],
-                                            drops_count,
-                                            event_drops,
-                                            event_day,
-                                            event_num,
-                                            record['Event_Name'],
-                                            "00:00"  # Start time is always 0 in the new format
-                                        )
-                                        # Update difficulty scores
-                                        st.session_state.event_records.loc[idx, 'Initial_Difficulty'] = initial_difficulty
-                                        st.session_state.event_records.loc[idx, 'Actual_Difficulty'] = actual_difficulty
-                                st.success(f"{between_event_participant} marked as dropped between events")
-                                # Save session
-                                save_session_state()
-                                # Need to rerun to refresh the UI
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Error recording between-event drop: {str(e)}")
-                    else:
-                        st.write("No participants available to mark as dropped between events.")
+                render_between_event_drop_form(
+                    team_name, team_roster, team_size, day, day_events,
+                    key_prefix="days3-4_"
+                )
                 # After all event expanders, add a section to show completion status for this day
                 st.write("---")
                 st.write("### Day Completion Status")
                 # Check how many events are recorded for this day and team
-                recorded_events = []
-                if not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns:
-                    day_records = st.session_state.event_records[
-                        (st.session_state.event_records['Team'] == team_name) &
-                        (st.session_state.event_records['Day'] == day)
-                    ]
-                    recorded_events = day_records['Event_Name'].tolist()
-                # Display completion status for each event
+                recorded_events = set()
+                recorded_count = 0
+                if has_records:
+                    day_records = get_team_event_records(team_name, day)
+                    recorded_events = set(day_records['Event_Name'])
+                    recorded_count = len(day_records)
+                # Display completion status for each event in a single markdown block
+                status_lines = []
                 for event_idx, event_name in enumerate(day_events):
                     if event_name in recorded_events:
-                        st.write(f"✅ Event {event_idx+1}: {event_name} - **Recorded**")
+                        status_lines.append(f"✅ Event {event_idx+1}: {event_name} - **Recorded**")
                     else:
-                        st.write(f"❌ Event {event_idx+1}: {event_name} - **Not Recorded**")
+                        status_lines.append(f"❌ Event {event_idx+1}: {event_name} - **Not Recorded**")
+                st.markdown("\n\n".join(status_lines))
                 # Show completion percentage
-                completion_pct = len(recorded_events) / len(day_events) * 100 if day_events else 0
+                completion_pct = recorded_count / len(day_events) * 100 if day_events else 0
                 st.progress(completion_pct / 100)
                 st.write(f"**Day {day} Completion: {completion_pct:.0f}%**")
         # After all day tabs, show a summary of all recorded events for this team
         st.write("---")
         st.subheader(f"Summary of All Recorded Events for {team_name}")
-        if not st.session_state.event_records.empty and 'Team' in st.session_state.event_records.columns:
-            team_records = st.session_state.event_records[
-                st.session_state.event_records['Team'] == team_name
-            ]
+        if has_records:
+            team_records = get_team_event_records(team_name)
             if not team_records.empty:
                 # Create a summary table
-                summary_data = []
-                for _, record in team_records.iterrows():
-                    # Count drops for this event
-                    drop_count = record['Drops']
-                    summary_data.append({
-                        'Day': record['Day'],
-                        'Event': f"Event {record['Event_Number']}: {record['Event_Name']}",
-                        'Duration': record['Time_Actual'],
-                        'Distance': f"{record['Distance_km']} km",
-                        'Heat': record['Heat_Category'],
-                        'Participants': f"{record['Initial_Participants'] - drop_count} / {record['Initial_Participants']}",
-                        'Drops': drop_count,
-                        'Difficulty': f"{record['Actual_Difficulty']:.2f}"
-                    })
-                # Convert to DataFrame and display
-                summary_df = pd.DataFrame(summary_data)
-                st.dataframe(summary_df.sort_values(['Day', 'Event']), use_container_width=True)
+                summary_df = build_event_summary(team_records)
+                st.dataframe(summary_df.sort_values(['Day', 'Event']), use_container_width=True,
+                             column_config=EVENT_SUMMARY_COLUMN_CONFIG)
                 # Add download button for team records
-                csv = team_records.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()
+                b64 = get_team_records_csv_b64(team_name, team_records)
                 href = f'<a href="data:file/csv;base64,{b64}" download="{team_name}_event_records.csv">Download {team_name} Event Records</a>'
                 st.markdown(href, unsafe_allow_html=True)
             else:
                 st.info(f"No events recorded yet for {team_name}.")
         # Show a summary of all drops for this team
         if not st.session_state.drop_data.empty:
-            team_drops = st.session_state.drop_data[
-                st.session_state.drop_data['Team'] == team_name
-            ]
+            # Slice the team's drops from the cached drop index instead of masking the whole table
+            team_drops = get_team_drops(team_name)
             if not team_drops.empty:
                 st.subheader(f"All Drops for {team_name}")
-                # Group drops by day and event
-                drop_summary = team_drops.groupby(['Day', 'Event_Number', 'Event_Name']).size().reset_index(name='Count')
-                # Create a nicer display
-                for _, drop_group in drop_summary.iterrows():
-                    st.write(f"**Day {drop_group['Day']}, Event {drop_group['Event_Number']}: {drop_group['Event_Name']}** - {drop_group['Count']} drops")
-                    # Get the drops for this event
-                    event_drops = team_drops[
-                        (team_drops['Day'] == drop_group['Day']) &
-                        (team_drops['Event_Number'] == drop_group['Event_Number']) &
-                        (team_drops['Event_Name'] == drop_group['Event_Name'])
-                    ]
+                # Group drops by day and event and display each group directly
+                for (drop_day, drop_event_number, drop_event_name), event_drops in team_drops.groupby(['Day', 'Event_Number', 'Event_Name']):
+                    st.write(f"**Day {drop_day}, Event {drop_event_number}: {drop_event_name}** - {len(event_drops)} drops")
                     # Display in a table
                     drop_display = event_drops[['Participant_Name', 'Drop_Time']].sort_values('Drop_Time')
                     drop_display.columns = ['Participant', 'Drop Time']
@@ -3067,9 +2263,7 @@ with tabs[4]:
         st.header("All Recorded Event Data for Days 3-4")
         if not st.session_state.event_records.empty:
             # Filter for Days 3-4 events
-            days_3_4_records = st.session_state.event_records[
-                st.session_state.event_records['Day'].isin([3, 4])
-            ]
+            days_3_4_records = get_phase_records((3, 4))
             if 'Team' in days_3_4_records.columns and not days_3_4_records.empty:
                 # Get unique teams
                 all_teams = days_3_4_records['Team'].unique().tolist()
@@ -3082,9 +2276,9 @@ with tabs[4]:
                 )
                 # Filter event records by selected teams
                 if selected_teams:
-                    filtered_records = days_3_4_records[
-                        days_3_4_records['Team'].isin(selected_teams)
-                    ]
+                    filtered_records, _, _ = filter_records(tuple(selected_teams), (), (), phase_days=(3, 4))
+                    # Build the event option list once and reuse it as the default
+                    event_options = sorted(filtered_records['Event_Name'].unique().tolist())
                     # Add day and event type filters
                     col1, col2 = st.columns(2)
                     with col1:
@@ -3097,51 +2291,38 @@ with tabs[4]:
                     with col2:
                         events = st.multiselect(
                             "Filter by Events",
-                            options=sorted(filtered_records['Event_Name'].unique().tolist()),
-                            default=sorted(filtered_records['Event_Name'].unique().tolist()),
+                            options=event_options,
+                            default=event_options,
                             key="days_3_4_event_filter"
                         )
                     # Apply additional filters
-                    if days:
-                        filtered_records = filtered_records[filtered_records['Day'].isin(days)]
-                    if events:
-                        filtered_records = filtered_records[filtered_records['Event_Name'].isin(events)]
+                    filtered_records, filtered_drops, drop_summary = filter_records(
+                        tuple(selected_teams), tuple(days), tuple(events), phase_days=(3, 4), drop_days=(3, 4)
+                    )
                     # Display the filtered data
                     if not filtered_records.empty:
                         # Select which columns to display
                         display_cols = ['Team', 'Day', 'Event_Number', 'Event_Name', 'Distance_km',
                                       'Time_Actual', 'Initial_Participants', 'Drops', 'Actual_Difficulty']
-                        st.dataframe(filtered_records[display_cols], use_container_width=True)
+                        st.dataframe(get_table_page(filtered_records[display_cols], "days_3_4_filtered_records_page"), use_container_width=True)
                         # Add a download button for the filtered data
-                        csv = filtered_records.to_csv(index=False)
-                        b64 = base64.b64encode(csv.encode()).decode()
-                        href = f'<a href="data:file/csv;base64,{b64}" download="days_3_4_filtered_event_records.csv">Download Filtered Data as CSV</a>'
-                        st.markdown(href, unsafe_allow_html=True)
+                        csv_bytes = get_filtered_csv_bytes('records', tuple(selected_teams), tuple(days), tuple(events), phase_days=(3, 4), drop_days=(3, 4))
+                        st.download_button("Download Filtered Data as CSV", data=csv_bytes, file_name="days_3_4_filtered_event_records.csv",
+                                           mime="text/csv", key="download_days_3_4_filtered_event_records")
                         # Show drop data for the filtered teams
                         if not st.session_state.drop_data.empty:
-                            filtered_drops = st.session_state.drop_data[
-                                (st.session_state.drop_data['Team'].isin(selected_teams)) &
-                                (st.session_state.drop_data['Day'].isin([3, 4]))
-                            ]
-                            if days:
-                                filtered_drops = filtered_drops[filtered_drops['Day'].isin(days)]
-                            if events:
-                                filtered_drops = filtered_drops[filtered_drops['Event_Name'].isin(events)]
                             if not filtered_drops.empty:
                                 st.subheader("Drops for Selected Teams/Events")
-                                # Group by team, day, event
-                                drop_summary = filtered_drops.groupby(['Team', 'Day', 'Event_Number', 'Event_Name']).size().reset_index(name='Drop_Count')
                                 # Display as a table
-                                drop_summary = drop_summary.sort_values(['Team', 'Day', 'Event_Number'])
                                 st.dataframe(drop_summary, use_container_width=True)
                                 # Option to view detailed drop data
                                 if st.checkbox("View detailed drop data", key="view_detailed_drops_days3-4"):
-                                    st.dataframe(filtered_drops.sort_values(['Team', 'Day', 'Event_Number', 'Drop_Time']), use_container_width=True)
+                                    sorted_drops = filtered_drops.sort_values(['Team', 'Day', 'Event_Number', 'Drop_Time'])
+                                    st.dataframe(get_table_page(sorted_drops, "days_3_4_filtered_drops_page"), use_container_width=True)
                                     # Add download button for drop data
-                                    csv = filtered_drops.to_csv(index=False)
-                                    b64 = base64.b64encode(csv.encode()).decode()
-                                    href = f'<a href="data:file/csv;base64,{b64}" download="days_3_4_filtered_drop_data.csv">Download Drop Data</a>'
-                                    st.markdown(href, unsafe_allow_html=True)
+                                    csv_bytes = get_filtered_csv_bytes('drops', tuple(selected_teams), tuple(days), tuple(events), phase_days=(3, 4), drop_days=(3, 4))
+                                    st.download_button("Download Drop Data", data=csv_bytes, file_name="days_3_4_filtered_drop_data.csv",
+                                                       mime="text/csv", key="download_days_3_4_filtered_drop_data")
                     else:
                         st.info("No records match the selected filters.")
                 else:
@@ -3155,24 +2336,12 @@ with tabs[4]:
         st.header("Comparison: Days 1-2 vs Days 3-4")
         if not st.session_state.event_records.empty:
             # Split data by days
-            days_1_2_data = st.session_state.event_records[st.session_state.event_records['Day'].isin([1, 2])]
-            days_3_4_data = st.session_state.event_records[st.session_state.event_records['Day'].isin([3, 4])]
+            days_1_2_data = get_phase_records((1, 2))
+            days_3_4_data = get_phase_records((3, 4))
             if not days_1_2_data.empty and not days_3_4_data.empty:
-                # Calculate summary statistics
-                stats_days_1_2 = {
-                    'Average Difficulty': days_1_2_data['Actual_Difficulty'].mean(),
-                    'Max Difficulty': days_1_2_data['Actual_Difficulty'].max(),
-                    'Min Difficulty': days_1_2_data['Actual_Difficulty'].min(),
-                    'Total Events': len(days_1_2_data),
-                    'Total Drops': days_1_2_data['Drops'].sum()
-                }
-                stats_days_3_4 = {
-                    'Average Difficulty': days_3_4_data['Actual_Difficulty'].mean(),
-                    'Max Difficulty': days_3_4_data['Actual_Difficulty'].max(),
-                    'Min Difficulty': days_3_4_data['Actual_Difficulty'].min(),
-                    'Total Events': len(days_3_4_data),
-                    'Total Drops': days_3_4_data['Drops'].sum()
-                }
+                # Summary statistics are reused until the event records change
+                stats_days_1_2 = get_phase_stats((1, 2))
+                stats_days_3_4 = get_phase_stats((3, 4))
                 # Create a DataFrame for display
                 comparison_df = pd.DataFrame({
                     'Statistic': stats_days_1_2.keys(),
@@ -3180,9 +2349,9 @@ with tabs[4]:
                     'Days 3-4': stats_days_3_4.values(),
                     'Change': [stats_days_3_4[k] - stats_days_1_2[k] for k in stats_days_1_2.keys()]
                 })
-                # Format the numeric columns
+                # Format the numeric columns in one vectorized pass each
                 for col in ['Days 1-2', 'Days 3-4', 'Change']:
-                    comparison_df[col] = comparison_df[col].apply(lambda x: f"{x:.2f}" if isinstance(x, float) else f"{x}")
+                    comparison_df[col] = np.char.mod('%.2f', comparison_df[col].to_numpy(dtype=float))
                 # Add a percent change column for applicable metrics
                 comparison_df['Percent Change'] = ''
                 for i, stat in enumerate(stats_days_1_2.keys()):
@@ -3192,7 +2361,6 @@ with tabs[4]:
                 # Display the comparison
                 st.dataframe(comparison_df, use_container_width=True)
                 # Create a visualization of the comparison
-                import plotly.express as px
                 # Prepare data for visualization
                 viz_data = []
                 for day in [1, 2, 3, 4]:
@@ -3244,9 +2412,7 @@ with tabs[5]:
         # Calculate final scores for each team
         if st.session_state.roster_data is not None and len(st.session_state.event_records) > 0:
             # Calculate team scores for days 1-2
-            days_1_2_data = st.session_state.event_records[
-                st.session_state.event_records['Day'].isin([1, 2])
-            ]
+            days_1_2_data = get_phase_records((1, 2))
             # Get original teams from roster data
             original_teams = st.session_state.roster_data[['Candidate_Name', 'Roster_Number', 'Initial_Team']].copy()
             original_teams['Team_Phase'] = 'Days 1-2'
@@ -3254,7 +2420,7 @@ with tabs[5]:
             if not days_1_2_data.empty:
                 if 'Team' in days_1_2_data.columns:
                     # Calculate team-specific difficulty scores
-                    team_difficulty_days_1_2 = days_1_2_data.groupby(['Team', 'Day'])['Actual_Difficulty'].mean().reset_index()
+                    team_difficulty_days_1_2 = days_1_2_data.groupby(['Team', 'Day'], observed=True)['Actual_Difficulty'].mean().reset_index()
                     team_difficulty_days_1_2['Team_Phase'] = 'Days 1-2'
                 else:
                     # Calculate overall difficulty scores by day
@@ -3263,16 +2429,14 @@ with tabs[5]:
                 st.subheader("Team Difficulty Scores for Days 1-2")
                 st.dataframe(team_difficulty_days_1_2)
             # Calculate team scores for days 3-4
-            days_3_4_data = st.session_state.event_records[
-                st.session_state.event_records['Day'].isin([3, 4])
-            ]
+            days_3_4_data = get_phase_records((3, 4))
             if not days_3_4_data.empty and st.session_state.reshuffled_teams is not None:
                 # Reshuffled teams data
                 reshuffled_team_data = st.session_state.reshuffled_teams.copy()
                 reshuffled_team_data['Team_Phase'] = 'Days 3-4'
                 if 'Team' in days_3_4_data.columns:
                     # Calculate team-specific difficulty scores
-                    team_difficulty_days_3_4 = days_3_4_data.groupby(['Team', 'Day'])['Actual_Difficulty'].mean().reset_index()
+                    team_difficulty_days_3_4 = days_3_4_data.groupby(['Team', 'Day'], observed=True)['Actual_Difficulty'].mean().reset_index()
                     team_difficulty_days_3_4['Team_Phase'] = 'Days 3-4'
                 else:
                     # Calculate overall difficulty scores by day
@@ -3287,7 +2451,7 @@ with tabs[5]:
                 ])
                 # Calculate final team scores across all days
                 if 'Team' in all_team_difficulties.columns:
-                    final_team_scores = all_team_difficulties.groupby('Team')['Actual_Difficulty'].mean().reset_index()
+                    final_team_scores = all_team_difficulties.groupby('Team', observed=True, sort=False)['Actual_Difficulty'].mean().reset_index()
                     final_team_scores.columns = ['Team', 'Average_Difficulty']
                     final_team_scores = final_team_scores.sort_values('Average_Difficulty', ascending=False)
                 else:
@@ -3318,43 +2482,28 @@ with tabs[5]:
                 # Calculate individual participant scores
                 st.subheader("Individual Participant Performance")
                 st.write("Note: Individual participant scores are based on their team's performance.")
-                # Create a combined dataframe with all participants and their teams
-                all_participants = []
-                # Add participants from Days 1-2
-                for _, row in original_teams.iterrows():
-                    participant_data = {
-                        'Participant_Name': row['Candidate_Name'],
-                        'Roster_Number': row['Roster_Number'],
-                        'Team_Days_1_2': row['Initial_Team']
-                    }
-                    all_participants.append(participant_data)
-                all_participants_df = pd.DataFrame(all_participants)
+                # Create a combined dataframe with all participants and their Days 1-2 teams
+                all_participants_df = pd.DataFrame({
+                    'Participant_Name': original_teams['Candidate_Name'].to_numpy(),
+                    'Roster_Number': original_teams['Roster_Number'].to_numpy(),
+                    'Team_Days_1_2': original_teams['Initial_Team'].to_numpy()
+                })
                 # Add team assignments for Days 3-4
                 if st.session_state.reshuffled_teams is not None:
-                    reshuffled_assignments = st.session_state.reshuffled_teams[['Candidate_Name', 'New_Team']].copy()
-                    reshuffled_assignments.columns = ['Participant_Name', 'Team_Days_3_4']
-                    # Merge with participant data
-                    all_participants_df = pd.merge(
-                        all_participants_df,
-                        reshuffled_assignments,
-                        on='Participant_Name',
-                        how='left'
-                    )
+                    # Look up each participant's new team through an indexed Series instead of a merge
+                    reshuffled = st.session_state.reshuffled_teams
+                    new_team_by_name = reshuffled.set_index('Candidate_Name')['New_Team']
+                    new_team_by_name = new_team_by_name[~new_team_by_name.index.duplicated()]
+                    all_participants_df['Team_Days_3_4'] = all_participants_df['Participant_Name'].map(new_team_by_name)
                 # Add difficulty scores for each phase
                 if 'Team' in team_difficulty_days_1_2.columns:
-                    # Calculate average difficulty by team for days 1-2
-                    team_avg_days_1_2 = team_difficulty_days_1_2.groupby('Team')['Actual_Difficulty'].mean().reset_index()
-                    team_avg_days_1_2.columns = ['Team', 'Avg_Difficulty_Days_1_2']
-                    # Map to participants
-                    team_map_days_1_2 = dict(zip(team_avg_days_1_2['Team'], team_avg_days_1_2['Avg_Difficulty_Days_1_2']))
-                    all_participants_df['Difficulty_Days_1_2'] = all_participants_df['Team_Days_1_2'].map(team_map_days_1_2)
+                    # Calculate average difficulty by team for days 1-2 and map it to participants
+                    team_avg_days_1_2 = team_difficulty_days_1_2.groupby('Team', observed=True, sort=False)['Actual_Difficulty'].mean()
+                    all_participants_df['Difficulty_Days_1_2'] = all_participants_df['Team_Days_1_2'].map(team_avg_days_1_2)
                 if 'Team' in team_difficulty_days_3_4.columns:
-                    # Calculate average difficulty by team for days 3-4
-                    team_avg_days_3_4 = team_difficulty_days_3_4.groupby('Team')['Actual_Difficulty'].mean().reset_index()
-                    team_avg_days_3_4.columns = ['Team', 'Avg_Difficulty_Days_3_4']
-                    # Map to participants
-                    team_map_days_3_4 = dict(zip(team_avg_days_3_4['Team'], team_avg_days_3_4['Avg_Difficulty_Days_3_4']))
-                    all_participants_df['Difficulty_Days_3_4'] = all_participants_df['Team_Days_3_4'].map(team_map_days_3_4)
+                    # Calculate average difficulty by team for days 3-4 and map it to participants
+                    team_avg_days_3_4 = team_difficulty_days_3_4.groupby('Team', observed=True, sort=False)['Actual_Difficulty'].mean()
+                    all_participants_df['Difficulty_Days_3_4'] = all_participants_df['Team_Days_3_4'].map(team_avg_days_3_4)
                 # Calculate overall average difficulty
                 if 'Difficulty_Days_1_2' in all_participants_df.columns and 'Difficulty_Days_3_4' in all_participants_df.columns:
                     all_participants_df['Overall_Difficulty'] = (all_participants_df['Difficulty_Days_1_2'] + all_participants_df['Difficulty_Days_3_4']) / 2
@@ -3363,12 +2512,10 @@ with tabs[5]:
                 # Display participant performance
                 st.dataframe(all_participants_df, use_container_width=True)
                 # Add download buttons
-                csv_final_teams = final_team_scores.to_csv(index=False)
-                b64_teams = base64.b64encode(csv_final_teams.encode()).decode()
+                b64_teams = to_csv_b64(final_team_scores)
                 href_teams = f'<a href="data:file/csv;base64,{b64_teams}" download="final_team_scores.csv">Download Final Team Scores</a>'
                 st.markdown(href_teams, unsafe_allow_html=True)
-                csv_participants = all_participants_df.to_csv(index=False)
-                b64_participants = base64.b64encode(csv_participants.encode()).decode()
+                b64_participants = to_csv_b64(all_participants_df)
                 href_participants = f'<a href="data:file/csv;base64,{b64_participants}" download="participant_performance.csv">Download Participant Performance Data</a>'
                 st.markdown(href_participants, unsafe_allow_html=True)
             else:
@@ -3413,7 +2560,7 @@ with tabs[6]:
             # Team difficulty comparison
             if 'Team' in st.session_state.event_records.columns:
                 st.subheader("Team Performance")
-                team_difficulty = st.session_state.event_records.groupby('Team')['Actual_Difficulty'].mean().reset_index()
+                team_difficulty = st.session_state.event_records.groupby('Team', observed=True, sort=False)['Actual_Difficulty'].mean().reset_index()
                 team_difficulty = team_difficulty.sort_values('Actual_Difficulty', ascending=False)
                 fig_team = px.bar(
                     team_difficulty,
@@ -3430,31 +2577,7 @@ with tabs[6]:
                 # Heat map of difficulty by team and day (more space-efficient than multiple charts)
                 if 'Team' in st.session_state.event_records.columns:
                     st.subheader("Difficulty Heat Map by Team and Day")
-                    # Calculate average difficulty by team and day
-                    heatmap_data = st.session_state.event_records.groupby(['Team', 'Day'])['Actual_Difficulty'].mean().reset_index()
-                    # Pivot the data for the heat map
-                    heatmap_pivot = heatmap_data.pivot(index='Team', columns='Day', values='Actual_Difficulty')
-                    # Create heat map
-                    fig12 = px.imshow(
-                        heatmap_pivot,
-                        labels=dict(x="Day", y="Team", color="Difficulty"),
-                        x=heatmap_pivot.columns,
-                        y=heatmap_pivot.index,
-                        color_continuous_scale='Viridis',
-                        title='Difficulty Heat Map by Team and Day'
-                    )
-                    # Add text annotations with values
-                    for i in range(len(heatmap_pivot.index)):
-                        for j in range(len(heatmap_pivot.columns)):
-                            value = heatmap_pivot.iloc[i, j]
-                            if not pd.isna(value):  # Only add annotation if value is not NaN
-                                fig12.add_annotation(
-                                    x=heatmap_pivot.columns[j],
-                                    y=heatmap_pivot.index[i],
-                                    text=f"{value:.2f}",
-                                    showarrow=False,
-                                    font=dict(color="white" if value > 3 else "black")
-                                )
+                    fig12 = get_cached_figure('difficulty_heatmap', build_difficulty_heatmap)
                     st.plotly_chart(fig12, use_container_width=True)
         # Tab 3: Drops Analysis
         with viz_tabs[2]:
@@ -3479,7 +2602,7 @@ with tabs[6]:
                         ["Drops by Team", "Drops by Team and Day"]
                     )
                     if drop_viz_type == "Drops by Team":
-                        drops_by_team = st.session_state.drop_data.groupby('Team').size().reset_index(name='Number_of_Drops')
+                        drops_by_team = st.session_state.drop_data.groupby('Team', sort=False).size().reset_index(name='Number_of_Drops')
                         drops_by_team = drops_by_team.sort_values('Number_of_Drops', ascending=False)
                         fig7 = px.bar(
                             drops_by_team,
@@ -3515,37 +2638,15 @@ with tabs[6]:
             )
             if correlation_type == "Equipment Weight vs Difficulty":
                 # Equipment weight vs difficulty correlation
-                fig10 = px.scatter(
-                    st.session_state.event_records,
-                    x='Equipment_Weight',
-                    y='Actual_Difficulty',
-                    color='Day',
-                    hover_data=['Event_Name', 'Team'],
-                    title='Equipment Weight vs Difficulty',
-                    labels={
-                        'Equipment_Weight': 'Equipment Weight (lbs)',
-                        'Actual_Difficulty': 'Actual Difficulty',
-                        'Day': 'Day'
-                    },
-                    trendline="ols"  # Add regression line
-                )
+                fig10 = get_cached_figure('weight_scatter', lambda: build_difficulty_scatter(
+                    'Equipment_Weight', 'Equipment Weight (lbs)', 'Equipment Weight vs Difficulty'
+                ))
                 st.plotly_chart(fig10, use_container_width=True)
             else:
                 # Distance vs difficulty correlation
-                fig11 = px.scatter(
-                    st.session_state.event_records,
-                    x='Distance_km',
-                    y='Actual_Difficulty',
-                    color='Day',
-                    hover_data=['Event_Name', 'Team'],
-                    title='Distance vs Difficulty',
-                    labels={
-                        'Distance_km': 'Distance (km)',
-                        'Actual_Difficulty': 'Actual Difficulty',
-                        'Day': 'Day'
-                    },
-                    trendline="ols"  # Add regression line
-                )
+                fig11 = get_cached_figure('distance_scatter', lambda: build_difficulty_scatter(
+                    'Distance_km', 'Distance (km)', 'Distance vs Difficulty'
+                ))
                 st.plotly_chart(fig11, use_container_width=True)
         # Download data button at the bottom of all tabs
         st.write("---")
@@ -26,6 +26,20 @@ def calculate_initial_difficulty(temp_multiplier, total_weight, participants, di
         print(f"Error calculating initial difficulty: {str(e)}")
         return 0
 
+def calculate_difficulties(temp_multipliers, total_weights, participants, distances, times, event_names):
+    """
+    Vectorized form of calculate_initial_difficulty over arrays of events
+    Also gives the actual difficulty of events without drops when passed actual times
+    """
+    participants = np.asarray(participants, dtype=float)
+    times = np.asarray(times, dtype=float)
+    # Sand Babies events only use half the distance
+    sand_babies = np.array(["SAND BABIES" in str(name).upper() for name in event_names], dtype=bool)
+    effective_distances = np.where(sand_babies, np.asarray(distances, dtype=float) * 0.5, distances)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        difficulties = np.asarray(temp_multipliers, dtype=float) * (np.asarray(total_weights, dtype=float) / participants) * (effective_distances / times)
+    return np.where((participants <= 0) | (times <= 0), 0.0, difficulties)
+
 def calculate_actual_difficulty(temp_multiplier, total_weight, initial_participants,
                               distance, time_actual_min, drops,
                               drop_data, day, event_number, event_name,
@@ -80,21 +94,13 @@ def calculate_actual_difficulty(temp_multiplier, total_weight, initial_participa
             difficulty = temp_multiplier * (total_weight / initial_participants) * (effective_distance / time_actual_min)
             return difficulty
         
-        # Filter drop data for this event
-        if 'Team' in drop_data.columns:
-            # Filter by team and event
-            event_drops = drop_data[
-                (drop_data['Day'] == day) &
-                (drop_data['Event_Number'] == event_number) &
-                (drop_data['Event_Name'] == event_name)
-            ]
-        else:
-            # Filter by event only
-            event_drops = drop_data[
-                (drop_data['Day'] == day) &
-                (drop_data['Event_Number'] == event_number) &
-                (drop_data['Event_Name'] == event_name)
-            ]
+        # Filter drop data for this event on the underlying arrays
+        event_mask = (
+            (drop_data['Day'].to_numpy() == day) &
+            (drop_data['Event_Number'].to_numpy() == event_number) &
+            (drop_data['Event_Name'].to_numpy() == event_name)
+        )
+        event_drops = drop_data[event_mask]
             
         # If no drop data available for this event, use the provided drops count
         if event_drops.empty:
@@ -116,14 +122,10 @@ def calculate_actual_difficulty(temp_multiplier, total_weight, initial_participa
         
         # Sort drop times
         drop_times_relative.sort()
-        # Calculate weighted average of participants
-        segments = [0] + drop_times_relative + [time_actual_min]
-        participant_counts = list(range(initial_participants, initial_participants - len(drop_times_relative) - 1, -1))
-        
-        weighted_participants = 0
-        for i in range(len(segments) - 1):
-            segment_duration = segments[i+1] - segments[i]
-            weighted_participants += participant_counts[i] * segment_duration
+        # Calculate weighted average of participants over all segments in one vectorized pass
+        segments = np.array([0] + drop_times_relative + [time_actual_min], dtype=float)
+        participant_counts = initial_participants - np.arange(len(drop_times_relative) + 1)
+        weighted_participants = float(np.dot(participant_counts, np.diff(segments)))
         effective_participants = weighted_participants / time_actual_min
         
         # Calculate difficulty with effective participants
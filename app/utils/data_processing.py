@@ -2,6 +2,7 @@ import pandas as pd
 import streamlit as st
 import os
 import numpy as np
+from functools import lru_cache
 
 def load_roster_data(file=None):
     """
@@ -81,6 +82,17 @@ def load_equipment_data(file=None):
         st.error(f"Error loading equipment data: {str(e)}")
         return None
 
+def get_default_event_equip_paths():
+    """
+    List the locations searched for the default event equipment CSV, in priority order
+    """
+    script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return [
+        os.path.join(script_dir, 'data', 'event_equipment.csv'),  # Try project root first
+        os.path.join(os.path.dirname(script_dir), 'data', 'event_equipment.csv'),  # Try one level up
+        os.path.join(script_dir, 'app', 'data', 'event_equipment.csv')  # Try app directory
+    ]
+
 def load_event_equip_data(file=None):
     """
     Load event equipment data from a CSV file or use default data
@@ -88,12 +100,7 @@ def load_event_equip_data(file=None):
     try:
         if file is None:
             # Use default data
-            script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            default_paths = [
-                os.path.join(script_dir, 'data', 'event_equipment.csv'),  # Try project root first
-                os.path.join(os.path.dirname(script_dir), 'data', 'event_equipment.csv'),  # Try one level up
-                os.path.join(script_dir, 'app', 'data', 'event_equipment.csv')  # Try app directory
-            ]
+            default_paths = get_default_event_equip_paths()
             
             # Try each path until we find a file
             df = None
@@ -125,6 +132,26 @@ def load_event_equip_data(file=None):
         st.error(f"Error loading event equipment data: {str(e)}")
         return None
 
+def load_event_equip_by_name():
+    """
+    Load the default event equipment data grouped into one DataFrame per event name
+    """
+    # Key the cache on the CSV's modification time so edits to the file are picked up
+    path = next((path for path in get_default_event_equip_paths() if os.path.exists(path)), None)
+    mtime = os.path.getmtime(path) if path else None
+    return group_event_equip_by_name(path, mtime)
+
+@st.cache_resource
+def group_event_equip_by_name(path, mtime):
+    """
+    Group the event equipment data at path into one DataFrame per event name
+    """
+    # Frames are shared across reruns and sessions, so callers must copy before editing
+    event_equip_data = load_event_equip_data(path)
+    if event_equip_data is None or event_equip_data.empty or 'EventName' not in event_equip_data.columns:
+        return {}
+    return {name: group for name, group in event_equip_data.groupby('EventName')}
+
 def load_events_data(file=None):
     """
     Transform event equipment data into the format needed for the app
@@ -136,56 +163,44 @@ def load_events_data(file=None):
             return None
         # Group by EventID and EventName to get unique events
         events = event_equip_data.groupby(['EventID', 'EventName']).first().reset_index()
-        # Create a combined events DataFrame
-        combined_events = []
-        # Process each unique event
-        for _, event in events.iterrows():
-            event_id = event['EventID']
-            event_name = event['EventName']
-            # Get all equipment for this event
-            event_equipment = event_equip_data[event_equip_data['EventID'] == event_id]
-            
-            # Calculate total weight using the formula: (EquipNum * EquipWt) / AppRatio
-            # This ensures the weight adjusts properly when EquipNum changes
-            event_equipment['Adjusted_Weight'] = (event_equipment['EquipNum'] * event_equipment['EquipWt']) / event_equipment['AppRatio']
-            total_weight = event_equipment['Adjusted_Weight'].sum()
-            total_count = event_equipment['EquipNum'].sum()
-            
-            # Get distance and time
-            distance_km = event_equipment['Distance_KM'].iloc[0]
-            time_std = event_equipment['Time_STD'].iloc[0]  # Time limit in minutes
-            # Convert time limit from minutes to mm:ss format
-            total_minutes = int(time_std)
-            seconds = int((time_std - total_minutes) * 60)
-            time_limit = f"{total_minutes:02d}:{seconds:02d}"
-            
-            # Handle special case for JUNK YARD - it counts as a full day
-            if event_name == 'JUNK YARD':
-                # Assign to a full day (e.g., Day 4)
-                day = 4
-                event_number = 1  # Only event for that day
-            else:
-                # Normal distribution for other events
-                # Simple distribution: events 1-6 on day 1, 7-12 on day 2, 13-18 on day 3, etc.
-                day = min(3, ((event_id - 1) // 6) + 1)  # Cap at day 3 to leave day 4 for JUNK YARD
-                event_number = ((event_id - 1) % 3) + 1
-            
-            # Create combined event record
-            combined_event = {
-                'Day': day,
-                'Event_Number': event_number,
-                'Event_Name': event_name,
-                'Equipment_Name': 'MIXED EQUIPMENT' if len(event_equipment) > 1 else event_equipment.iloc[0]['EquipmentName'],
-                'Equipment_Weight': total_weight,  # Using the new Adjusted_Weight sum
-                'Number_of_Equipment': total_count,
-                'Time_Limit': time_limit,  # Format: mm:ss
-                'Initial_Participants': 18,  # Default team size
-                'Distance': distance_km
-            }
-            combined_events.append(combined_event)
-        
-        # Create DataFrame from the combined events
-        combined_df = pd.DataFrame(combined_events)
+        # Calculate each item's weight using the formula: (EquipNum * EquipWt) / AppRatio
+        # This ensures the weight adjusts properly when EquipNum changes
+        adjusted_weight = (event_equip_data['EquipNum'] * event_equip_data['EquipWt']) / event_equip_data['AppRatio']
+        # Aggregate the equipment of every event in one grouped pass instead of filtering per event
+        event_totals = event_equip_data.assign(Adjusted_Weight=adjusted_weight).groupby('EventID').agg(
+            Equipment_Weight=('Adjusted_Weight', 'sum'),
+            Number_of_Equipment=('EquipNum', 'sum'),
+            Item_Count=('EquipNum', 'size'),
+            First_Equipment=('EquipmentName', 'first'),
+            Distance=('Distance_KM', 'first'),
+            Time_STD=('Time_STD', 'first')
+        )
+        event_totals = event_totals.reindex(events['EventID'])
+        event_ids = events['EventID'].to_numpy()
+        event_names = events['EventName'].to_numpy()
+        # Convert time limit from minutes to mm:ss format
+        time_std = event_totals['Time_STD'].to_numpy()
+        total_minutes = time_std.astype(int)
+        seconds = ((time_std - total_minutes) * 60).astype(int)
+        # Handle special case for JUNK YARD - it counts as a full day (Day 4, only event for that day)
+        is_junk_yard = event_names == 'JUNK YARD'
+        # Simple distribution: events 1-6 on day 1, 7-12 on day 2, 13-18 on day 3, etc.
+        # Cap at day 3 to leave day 4 for JUNK YARD
+        day = np.where(is_junk_yard, 4, np.minimum(3, ((event_ids - 1) // 6) + 1))
+        event_number = np.where(is_junk_yard, 1, ((event_ids - 1) % 3) + 1)
+        # Create combined event records
+        combined_df = pd.DataFrame({
+            'Day': day,
+            'Event_Number': event_number,
+            'Event_Name': event_names,
+            'Equipment_Name': np.where(event_totals['Item_Count'].to_numpy() > 1, 'MIXED EQUIPMENT',
+                                       event_totals['First_Equipment'].to_numpy()),
+            'Equipment_Weight': event_totals['Equipment_Weight'].to_numpy(),  # Using the Adjusted_Weight sum
+            'Number_of_Equipment': event_totals['Number_of_Equipment'].to_numpy(),
+            'Time_Limit': [f"{m:02d}:{sec:02d}" for m, sec in zip(total_minutes, seconds)],  # Format: mm:ss
+            'Initial_Participants': 18,  # Default team size
+            'Distance': event_totals['Distance'].to_numpy()
+        })
         # Save the combined data for future use
         script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         combined_path = os.path.join(script_dir, 'data', 'events_combined.csv')
@@ -323,28 +338,32 @@ def create_default_roster():
             })
     return pd.DataFrame(roster_data)
 
+@lru_cache(maxsize=1024)
+def parse_time_str(time_str):
+    """
+    Parse a 'mm:ss' time string into minutes, raising on invalid input
+    """
+    # Only successful parses are cached, so errors are still reported on every call
+    parts = time_str.split(':')
+    if len(parts) != 2:
+        raise ValueError("Time must be in format 'mm:ss'")
+    minutes = int(parts[0])
+    seconds = int(parts[1])
+    return minutes + seconds / 60
+
 def time_str_to_minutes(time_str):
     """
     Convert time string in format 'mm:ss' to minutes (float)
     Minutes can exceed 60
     """
     try:
-        parts = time_str.split(':')
-        if len(parts) != 2:
-            raise ValueError("Time must be in format 'mm:ss'")
-        minutes = int(parts[0])
-        seconds = int(parts[1])
-        return minutes + seconds / 60
+        return parse_time_str(time_str)
     except Exception as e:
         st.error(f"Error converting time: {str(e)}")
         return 0
 
 def ensure_sample_data_exists():
     """Create sample data files if they don't exist"""
-    from utils.data_processing import (
-        create_default_roster, create_default_event_equipment
-    )
-    
     # Get the directories
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
@@ -408,6 +427,23 @@ def minutes_to_time_str(minutes):
         st.error(f"Error converting minutes to time string: {str(e)}")
         return "00:00"
 
+@lru_cache(maxsize=1024)
+def parse_military_time(time_str):
+    """
+    Parse a military time (HH:MM) into minutes since midnight, raising on invalid input
+    """
+    parts = time_str.split(':')
+    if len(parts) != 2:
+        raise ValueError("Time must be in format 'HH:MM'")
+    
+    hours = int(parts[0])
+    minutes = int(parts[1])
+    
+    if hours < 0 or hours > 23 or minutes < 0 or minutes > 59:
+        raise ValueError("Invalid time values")
+    
+    return hours * 60 + minutes
+
 def military_time_to_minutes(time_str):
     """
     Convert military time (HH:MM) to minutes since midnight
@@ -423,17 +459,7 @@ def military_time_to_minutes(time_str):
         Minutes since midnight
     """
     try:
-        parts = time_str.split(':')
-        if len(parts) != 2:
-            raise ValueError("Time must be in format 'HH:MM'")
-        
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        
-        if hours < 0 or hours > 23 or minutes < 0 or minutes > 59:
-            raise ValueError("Invalid time values")
-        
-        return hours * 60 + minutes
+        return parse_military_time(time_str)
     except Exception as e:
         st.error(f"Error converting military time: {str(e)}")
         return 0
@@ -50,16 +50,16 @@ def reshuffle_teams(active_participants, team_difficulty_df=None, target_team_si
         team_assignments = []
         
         # First, distribute officers evenly across teams
-        for i, (_, officer) in enumerate(officers.iterrows()):
+        # Iterate plain row dicts instead of building a Series per row
+        for i, officer_dict in enumerate(officers.to_dict('records')):
             team_num = i % num_teams + 1
-            officer_dict = officer.to_dict()
             officer_dict['New_Team'] = f'Team {team_num}'
             team_assignments.append(officer_dict)
         
         # Next, distribute each type of enlisted to maintain overall balance
         for candidate_type, participants in type_groups.items():
             if candidate_type not in ['ADO', 'NGO']:  # Only process enlisted types
-                for i, (_, participant) in enumerate(participants.iterrows()):
+                for i, participant_dict in enumerate(participants.to_dict('records')):
                     # Calculate current distribution to ensure balance
                     current_assignments = pd.DataFrame(team_assignments)
                     
@@ -78,12 +78,10 @@ def reshuffle_teams(active_participants, team_difficulty_df=None, target_team_si
                         
                         # Assign to team with lowest ratio to balance
                         best_team = team_counts.iloc[0]['New_Team']
-                        participant_dict = participant.to_dict()
                         participant_dict['New_Team'] = best_team
                     else:
                         # If no assignments yet, distribute evenly
                         team_num = i % num_teams + 1
-                        participant_dict = participant.to_dict()
                         participant_dict['New_Team'] = f'Team {team_num}'
                     
                     team_assignments.append(participant_dict)
@@ -93,13 +91,15 @@ def reshuffle_teams(active_participants, team_difficulty_df=None, target_team_si
         
         # Calculate and display team composition stats for verification
         if not reshuffled_teams.empty:
-            team_stats = reshuffled_teams.groupby('New_Team').apply(
-                lambda x: pd.Series({
-                    'Officers': sum(x['Is_Officer']),
-                    'Enlisted': sum(~x['Is_Officer']),
-                    'Total': len(x)
-                })
-            ).reset_index()
+            # Count every candidate type per team in one pass and derive the officer stats from it
+            type_counts = pd.crosstab(reshuffled_teams['New_Team'], reshuffled_teams['Candidate_Type'])
+            officer_counts = type_counts[[col for col in ['ADO', 'NGO'] if col in type_counts.columns]].sum(axis=1)
+            team_counts_total = type_counts.sum(axis=1)
+            team_stats = pd.DataFrame({
+                'Officers': officer_counts,
+                'Enlisted': team_counts_total - officer_counts,
+                'Total': team_counts_total
+            }).reset_index()
             
             team_stats['Officer:Enlisted Ratio'] = team_stats['Enlisted'] / team_stats['Officers']
             
@@ -107,7 +107,7 @@ def reshuffle_teams(active_participants, team_difficulty_df=None, target_team_si
             print(team_stats)
             
             # Calculate detailed type distribution
-            type_distribution = reshuffled_teams.groupby(['New_Team', 'Candidate_Type']).size().unstack(fill_value=0).reset_index()
+            type_distribution = type_counts.reset_index()
             print("\nDetailed Type Distribution:")
             print(type_distribution)
             
@@ -135,7 +135,7 @@ def plot_final_difficulty_scores(event_records, team_data):
         # Check if we have team-specific data
         if 'Team' in event_records.columns:
             # Calculate average difficulty by team
-            team_difficulty = event_records.groupby('Team')['Actual_Difficulty'].mean().reset_index()
+            team_difficulty = event_records.groupby('Team', observed=True)['Actual_Difficulty'].mean().reset_index()
             team_difficulty = team_difficulty.sort_values('Actual_Difficulty', ascending=False)
             
             # Create figure